@@ -412,9 +412,10 @@ async def get_realtime_candle():
             print("OK: Asset está aberto.")
             client.start_candles_stream(asset)
             while True:
-                prices = client.get_realtime_candles(asset)
-                if len(prices[asset]) == list_size:
+                prices = await client.get_realtime_price(asset)
+                if len(prices) >= list_size:
                     break
+                await asyncio.sleep(0.1)
             print(prices)
         else:
             print("ERRO: Asset está fechado.")
@@ -0,0 +1,68 @@
+"""Microbenchmarks of the Engine.IO / Socket.IO frame codec.
+
+    python -m benchmarks.bench_codec
+"""
+import timeit
+
+from quotexapi.utils.json_backend import get_json_backend
+from quotexapi.utils.json_backend import json_backends
+from quotexapi.ws.codec import Decoder
+from quotexapi.ws.codec import encode_event
+
+HEADER = '451-["quotes/stream",{"_placeholder":true,"num":0}]'
+TICK = b'\x04[["EURUSD_otc",1700000000.123,1.08765,0]]'
+TWO_ATTACHMENTS = '452-["history/list/v2",{"_placeholder":true,"num":0},{"_placeholder":true,"num":1}]'
+EVENT = '42["s_authorization"]'
+PAYLOAD = {"asset": "EURUSD_otc", "period": 60}
+
+
+def bench(name, statement, number=100000):
+    """
+
+    :param name:
+    :param statement:
+    :param number:  (Default value = 100000)
+
+    """
+    seconds = min(timeit.repeat(statement, number=number, repeat=5))
+    print(f"{name:<32} {seconds / number * 1e6:8.3f} us")
+
+
+def run(backend):
+    """
+
+    :param backend: The :class:`JsonBackend
+        <quotexapi.utils.json_backend.JsonBackend>` under test.
+
+    """
+    decoder = Decoder(loads=backend.loads, binary_loads=backend.loads)
+
+    def binary_event():
+        decoder.decode(HEADER)
+        return decoder.decode(TICK)
+
+    def multi_attachment_event():
+        decoder.decode(TWO_ATTACHMENTS)
+        decoder.decode(TICK)
+        return decoder.decode(TICK)
+
+    bench("decode header + binary tick", binary_event)
+    bench("decode 2-attachment event", multi_attachment_event)
+    bench("decode text event", lambda: decoder.decode(EVENT))
+    bench("decode ping", lambda: decoder.decode("2"))
+    bench("encode event", lambda: encode_event("tick"))
+    bench("encode event with payload",
+          lambda: encode_event("instruments/update", PAYLOAD,
+                               dumps=backend.dumps))
+
+
+def main():
+    """ """
+    for name, (_, available) in json_backends.items():
+        if available():
+            print(f"[{name}]")
+            run(get_json_backend(name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Benchmark of the per-frame cost of `WebsocketClient.on_message`.
+
+Compares the legacy string-sniffing if/elif chain against the event-name
+dispatch table on a frame mix dominated by realtime quotes, and the cost of
+the opt-in local candle aggregation on top of it.
+
+    python -m benchmarks.bench_on_message
+"""
+import json
+import time
+from collections import defaultdict
+
+from quotexapi import global_value
+from quotexapi.api import QuotexAPI
+from quotexapi.constants import DEAL_STATUS_LOSS
+from quotexapi.constants import DEAL_STATUS_WIN
+from quotexapi.utils.ring_buffer import PriceBuffer
+from quotexapi.ws.client import WebsocketClient
+
+# The periods of `Quotex.size`, aggregated with `local_candles` on.
+PERIODS = [1, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 14400,
+           86400]
+
+
+def legacy_on_message(client, wss, message):
+    """The `on_message` chain replaced by the dispatch table.
+
+    :param client:
+    :param wss:
+    :param message:
+
+    """
+    api = client.api
+    api.tick()
+    try:
+        if "authorization/reject" in str(message):
+            global_value.check_rejected_connection = 1
+        elif "s_authorization" in str(message):
+            global_value.check_accepted_connection = 1
+            global_value.check_rejected_connection = 0
+        elif "instruments/list" in str(message):
+            global_value.started_listen_instruments = True
+        try:
+            message = json.loads(message[1:].decode())
+            api.wss_message = message
+            if "call" in str(message) or "put" in str(message):
+                api.instruments = message
+            if message.get("signals"):
+                pass
+            elif message.get("liveBalance") or message.get("demoBalance"):
+                api.account_balance = message
+            elif message.get("index"):
+                api.candles.candles_data = message
+            elif message.get("purchaseTime"):
+                request_id = message.get("requestId")
+                api.orders[request_id]["id"] = message.get("id")
+                api.orders[request_id]["response"] = message
+            elif message.get("ticket"):
+                api.sold_options_respond = message
+            elif message.get("deals"):
+                for deal in message["deals"]:
+                    request_id = api.get_request_id_from_order_id(deal["id"])
+                    if request_id:
+                        api.orders[request_id]["status"] = (
+                            DEAL_STATUS_WIN if deal["profit"] > 0 else DEAL_STATUS_LOSS)
+            elif message.get("isDemo") and message.get("balance"):
+                api.training_balance_edit_request = message
+            elif message.get("error"):
+                global_value.websocket_error_reason = message.get("error")
+            elif not message.get("list") == []:
+                api.wss_message = message
+        except:
+            pass
+        if str(message) == "41":
+            global_value.check_websocket_if_connect = 0
+        if "51-" in str(message):
+            api._temp_status = str(message)
+        elif (api._temp_status ==
+              """451-["settings/list",{"_placeholder":true,"num":0}]"""):
+            api.settings_list = message
+            api._temp_status = ""
+        elif len(message[0]) == 4:
+            result = {"time": message[0][1], "price": message[0][2]}
+            api.realtime_price[message[0][0]].append(result)
+        elif len(message[0]) == 2:
+            for i in message:
+                api.realtime_sentiment[i[0]] = {
+                    "sentiment": {"sell": 100 - int(i[1]), "buy": int(i[1])}
+                }
+    except:
+        pass
+
+
+def binary_event(event, data):
+    """
+
+    :param event:
+    :param data:
+
+    """
+    return [
+        f'451-["{event}",{{"_placeholder":true,"num":0}}]',
+        b"\x04" + json.dumps(data).encode(),
+    ]
+
+
+def build_frames():
+    """ """
+    frames = []
+    for i in range(200):
+        frames += binary_event("quotes/stream",
+                               [["EURUSD_otc", 1700000000.123 + i, 1.08765, 0]])
+    for i in range(10):
+        frames += binary_event("depth/change", [["EURUSD_otc", 55]])
+    frames += binary_event("s_balance/list",
+                           {"liveBalance": 10.5, "demoBalance": 9981.5, "isDemo": 1})
+    frames += ["2", "3"]
+    return frames
+
+
+def run(handler, frames, repeat):
+    """
+
+    :param handler:
+    :param frames:
+    :param repeat:
+
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            handler(None, frame)
+    return (time.perf_counter() - started) / (repeat * len(frames))
+
+
+def main(repeat=200):
+    """
+
+    :param repeat:  (Default value = 200)
+
+    """
+    frames = build_frames()
+    print(f"frames per run:  {len(frames)}")
+    for json_backend in ("json", "auto"):
+        api = QuotexAPI("qxbroker.com", "", "", "pt", json_backend=json_backend)
+        api.tick = lambda: None
+        api._temp_status = ""
+        api.realtime_price = defaultdict(PriceBuffer)
+        client = WebsocketClient(api)
+        legacy = run(
+            lambda wss, message: legacy_on_message(client, wss, message),
+            frames, repeat)
+        api.realtime_price = defaultdict(PriceBuffer)
+        dispatch = run(client.on_message, frames, repeat)
+        api.realtime_price = defaultdict(PriceBuffer)
+        api.candle_periods = PERIODS
+        api.candle_aggregators = {}
+        aggregated = run(client.on_message, frames, repeat)
+        api.candle_periods = None
+        print(f"[{api.json_backend.name}]")
+        print(f"legacy chain:    {legacy * 1e6:8.2f} us/frame")
+        print(f"dispatch table:  {dispatch * 1e6:8.2f} us/frame")
+        print(f"speedup:         {legacy / dispatch:8.2f}x")
+        print(f"+ local candles: {aggregated * 1e6:8.2f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 """Module for Quotex websocket."""
-import json
+import asyncio
 import logging
 import os
 import platform
@@ -25,12 +25,21 @@ from .http.login import Login
 from .http.logout import Logout
 from .http.navigator import Browser
 from .http.settings import Settings
+from .utils.json_backend import get_json_backend
+from .utils.ring_buffer import PriceBuffer
 from .ws.channels.buy import Buy
 from .ws.channels.candles import GetCandles
 from .ws.channels.sell_option import SellOption
 from .ws.channels.ssid import Ssid
 from .ws.client import WebsocketClient
+from .ws.codec import encode_event
+from .ws.outbound import OutboundQueue
+from .ws.pending import PendingRequests
+from .ws.scheduler import OrderScheduler
+from .ws.templates import FrameTemplates
+from .ws.templates import volatile
 from .ws.objects.candles import Candles
+from .ws.objects.handshake import Handshake
 from .ws.objects.listinfodata import ListInfoData
 from .ws.objects.profile import Profile
 from .ws.objects.timesync import TimeSync
@@ -72,6 +81,8 @@ class QuotexAPI(object):
     socket_option_opened = {}
     buy_id = None
     orders = {}
+    # Shared like `orders`, so orders opened before a reconnect still resolve.
+    order_ids = {}
     trace_ws = False
     buy_expiration = None
     current_asset = None
@@ -84,6 +95,7 @@ class QuotexAPI(object):
     profit_in_operation = None
     sold_options_respond = None
     sold_digital_options_respond = None
+    realtime_price_capacity = 1024
     listinfodata = ListInfoData()
     timesync = TimeSync()
     candles = Candles()
@@ -102,6 +114,11 @@ class QuotexAPI(object):
         proxies=None,
         resource_path=None,
         user_data_dir=".",
+        ws_transport="asyncio",
+        json_backend="auto",
+        compression=True,
+        compression_options=None,
+        tick_interval=10.0,
     ):
         """
         :param str host: The hostname or ip address of a Quotex server.
@@ -115,19 +132,44 @@ class QuotexAPI(object):
         :param proxies: The proxies of a Quotex server.
         :param str|Path resource_path:
         :param user_data_dir: The path browser user data dir.
+        :param str ws_transport: "asyncio" to run the websocket on the event loop
+            or "thread" to fall back to the threaded `websocket-client`.
+        :param str json_backend: "orjson", "msgspec", "json" or "auto" to use
+            the fastest one installed.
+        :param bool compression: Negotiate `permessage-deflate` on the asyncio
+            transport.
+        :param dict compression_options: The `permessage-deflate` parameters,
+            `client_no_context_takeover`, `client_max_window_bits`,
+            `server_no_context_takeover` and `server_max_window_bits`.
+        :param float tick_interval: Minimum seconds between app-level ticks.
         """
         self.host = host
         self.https_url = f"https://{host}"
         self.wss_url = f"wss://ws2.{host}/socket.io/?EIO=3&transport=websocket"
-        self.last_tick_sec = None
+        self.last_tick = None
+        self.tick_interval = tick_interval
         self.wss_message = None
         self.websocket_thread = None
+        self.websocket_task = None
         self.websocket_client = None
+        self.outbound = None
+        self.ws_transport = ws_transport
+        self.json_backend = get_json_backend(json_backend)
+        self.compression = compression
+        self.compression_options = compression_options
+        self.templates = FrameTemplates(self.encode_wss_payload,
+                                        self.json_backend.dumps)
+        self.loop = None
+        self.connection_event = None
+        self.handshake = Handshake()
+        self.authorization = None
+        self.pending = PendingRequests()
+        self.scheduler = OrderScheduler(self)
+        self.balance_watchers = []
         self.set_ssid = None
         self.object_id = None
         self.token_login2fa = None
         self.is_logged = False
-        self._temp_status = ""
         self.username = username
         self.password = password
         self.email_pass = email_pass
@@ -144,6 +186,8 @@ class QuotexAPI(object):
         self.get_candle_data = {}
         self.candle_v2_data = {}
         self.realtime_price = {}
+        self.candle_periods = None
+        self.candle_aggregators = {}
         self.realtime_sentiment = {}
         self.session_data = {}
         self.browser = Browser()
@@ -159,17 +203,18 @@ class QuotexAPI(object):
         """
         return self.websocket_client.wss
 
-    def tick(self):
-        """ """
-        if self.last_tick_sec is None:
-            tm_sec_diff = None
-        else:
-            self.last_tick_sec = self.last_tick_sec or time.localtime().tm_sec
-            tm_sec_diff = (time.localtime().tm_sec - self.last_tick_sec)
-        if tm_sec_diff is not None and tm_sec_diff > 0 < 10:
+    def tick(self, force=False):
+        """Send the app-level tick, at most once per :attr:`tick_interval`.
+
+        :param force: Send even if the last tick is recent.  (Default value = False)
+
+        """
+        now = time.monotonic()
+        if (not force and self.last_tick is not None
+                and now - self.last_tick < self.tick_interval):
             return
-        self.send_wss_payload("tick")
-        self.last_tick_sec = time.localtime().tm_sec
+        self.send_websocket_request(self.templates.render("tick"))
+        self.last_tick = now
 
     def subscribe_realtime_candle(self, asset, period: int = 60):
         """
@@ -178,11 +223,13 @@ class QuotexAPI(object):
         :param period: int:  (Default value = 60)
 
         """
-        self.realtime_price[asset] = []
-        return self.send_wss_payload("instruments/update", {
-            "asset": asset,
-            "period": period
-        })
+        self.realtime_price[asset] = PriceBuffer(self.realtime_price_capacity)
+        return self.send_websocket_request(
+            self.templates.render("instruments/update", (asset, period),
+                                  lambda: {
+                                      "asset": asset,
+                                      "period": period
+                                  }))
 
     def follow_asset(self, asset):
         """
@@ -190,7 +237,9 @@ class QuotexAPI(object):
         :param asset:
 
         """
-        return self.send_wss_payload("instruments/follow", asset)
+        return self.send_websocket_request(
+            self.templates.render("instruments/follow", asset,
+                                  lambda: self.json_backend.dumps(asset)))
 
     def follow_candle(self, asset):
         """
@@ -198,7 +247,9 @@ class QuotexAPI(object):
         :param asset:
 
         """
-        return self.send_wss_payload("depth/follow", asset)
+        return self.send_websocket_request(
+            self.templates.render("depth/follow", asset,
+                                  lambda: self.json_backend.dumps(asset)))
 
     def unfollow_candle(self, asset):
         """
@@ -206,7 +257,9 @@ class QuotexAPI(object):
         :param asset:
 
         """
-        return self.send_wss_payload("depth/unfollow", asset)
+        return self.send_websocket_request(
+            self.templates.render("depth/unfollow", asset,
+                                  lambda: self.json_backend.dumps(asset)))
 
     def unsubscribe_realtime_candle(self, asset):
         """
@@ -214,7 +267,7 @@ class QuotexAPI(object):
         :param asset:
 
         """
-        return self.send_wss_payload("subfor", asset)
+        return self.send_wss_payload("subfor", self.json_backend.dumps(asset))
 
     def get_chart_notifications(self, asset, version: str = "1.0.0"):
         """
@@ -223,10 +276,12 @@ class QuotexAPI(object):
         :param version: str:  (Default value = "1.0.0")
 
         """
-        self.send_wss_payload("chart_notification/get", {
-            "asset": asset,
-            "version": version
-        })
+        self.send_websocket_request(
+            self.templates.render("chart_notification/get", (asset, version),
+                                  lambda: {
+                                      "asset": asset,
+                                      "version": version
+                                  }))
 
     def switch_to_asset(self, asset: str, duration: int = 60):
         """
@@ -238,12 +293,26 @@ class QuotexAPI(object):
         exp_time = (get_expiration_time_quotex(
             int(self.timesync.server_timestamp), duration)
                     if "_otc" not in asset else duration)
-        payload = {
+        self.send_websocket_request(
+            self.templates.render("settings/store", (asset, duration),
+                                  lambda: self.asset_settings(asset, duration),
+                                  exp_time=exp_time))
+
+    @staticmethod
+    def asset_settings(asset: str, duration: int):
+        """Build the `settings/store` payload, the expiration time is left as
+        a volatile field of the frame template.
+
+        :param asset: str:
+        :param duration: int:
+
+        """
+        return {
             "chartId": "graph",
             "settings": {
                 "chartId": "graph",
                 "chartType": 2,
-                "currentExpirationTime": exp_time,
+                "currentExpirationTime": volatile("exp_time"),
                 "isFastOption": False,
                 "isFastAmountOption": False,
                 "isIndicatorsMinimized": False,
@@ -265,8 +334,6 @@ class QuotexAPI(object):
             },
         }
 
-        self.send_wss_payload("settings/store", payload)
-
     @deprecated("Use `refill_demo_balance(...)` instead")
     def edit_training_balance(self, amount):
         """
@@ -276,13 +343,20 @@ class QuotexAPI(object):
         """
         self.refill_demo_balance(amount)
 
-    def refill_demo_balance(self, amount):
+    def refill_demo_balance(self, amount, timeout=None):
         """
 
         :param amount:
+        :param timeout: Seconds to wait for the response.  (Default value = None)
+        :returns: The future resolved with the `demo/refill` response.
 
         """
-        self.send_wss_payload("demo/refill", amount)
+        future = self.pending.add("demo/refill", timeout=timeout)
+        try:
+            self.send_wss_payload("demo/refill", amount)
+        except ValueError as e:
+            self.pending.fail("demo/refill", exception=e)
+        return future
 
     def signals_subscribe(self):
         """ """
@@ -479,18 +553,40 @@ class QuotexAPI(object):
         """Send websocket request to Quotex server.
 
         :param str: data: The websocket request data.
-        :param bool: no_force_send: Default True.
+        :param bool: no_force_send: Default True, queue the frame behind the
+            ones already waiting; False writes it to the socket immediately.
         :param data:
         :param no_force_send:  (Default value = True)
+        :raises ValueError: The frame exceeds the server `maxPayload`, it is
+            not sent.
+
+        """
+        max_payload = self.handshake.max_payload
+        size = len(data.encode()) if isinstance(data, str) else len(data)
+        if max_payload and size > max_payload:
+            raise ValueError(
+                f"Websocket frame of {size} bytes exceeds the server "
+                f"maxPayload of {max_payload} bytes, not sent.")
+        if no_force_send:
+            self.outbound.put(data)
+        else:
+            self.websocket.send(data)
+        logger.debug(data)
+
+    def encode_wss_payload(self,
+                           action: str,
+                           payload: Optional[str | dict] = None):
+        """Encode a payload into a websocket frame for the specified action.
+
+        :param action: str:
+        :param payload: Optional[str | dict]:  (Default value = None)
 
         """
-        while (global_value.ssl_Mutual_exclusion
-               or global_value.ssl_Mutual_exclusion_write) and no_force_send:
-            pass
-        global_value.ssl_Mutual_exclusion_write = True
-        self.websocket.send(data)
-        logger.debug(data)
-        global_value.ssl_Mutual_exclusion_write = False
+        if payload is None or not payload:
+            return encode_event(action)
+        elif isinstance(payload, str):
+            return f'42["{action}",{payload}]'
+        return encode_event(action, payload, dumps=self.json_backend.dumps)
 
     def send_wss_payload(self,
                          action: str,
@@ -499,22 +595,15 @@ class QuotexAPI(object):
         """Convenience method to send a payload over websocket to Quotex server.
 
         :param str: action: wss action being performed, ex. "tick"
-        :param Any: payload: json/dict payload to send with specified action
-        :param bool: no_force_send: Specify whether to wait for write lock
+        :param Any: payload: json/dict payload to send with specified action,
+            a `str` payload is sent as already encoded JSON
+        :param bool: no_force_send: Specify whether to go through the send queue
         :param action: str:
         :param payload: Optional[str | dict]:  (Default value = None)
         :param no_force_send:  (Default value = True)
 
         """
-        data = f'42["{action}"%payload%]'
-
-        if payload is not None and payload:
-            if isinstance(payload, dict):
-                payload = json.dumps(payload)
-            data = data.replace('%payload%', f",{payload}")
-        else:
-            data = data.replace('%payload%', '')
-
+        data = self.encode_wss_payload(action, payload)
         return self.send_websocket_request(data, no_force_send)
 
     @deprecated("Use `authenticate(...)` instead")
@@ -547,11 +636,15 @@ class QuotexAPI(object):
         global_value.websocket_error_reason = None
         if not global_value.SSID:
             await self.authenticate()
+        self.loop = asyncio.get_running_loop()
+        self.connection_event = asyncio.Event()
+        self.pending.loop = self.loop
+        self.handshake.reset()
         self.websocket_client = WebsocketClient(self)
+        self.outbound = OutboundQueue(
+            self.websocket.send, getattr(self.websocket, "send_many", None))
+        self.outbound.start()
         payload = {
-            "ping_interval": 24,
-            "ping_timeout": 20,
-            "ping_payload": "2",
             "origin": self.https_url,
             "host": f"ws2.{self.host}",
             "sslopt": {
@@ -561,11 +654,16 @@ class QuotexAPI(object):
                 "context": ssl_context,
             },
         }
-        payload["sslopt"]["ssl_version"] = ssl.PROTOCOL_TLSv1_2
-        self.websocket_thread = threading.Thread(
-            target=self.websocket.run_forever, kwargs=payload)
-        self.websocket_thread.daemon = True
-        self.websocket_thread.start()
+        if self.ws_transport == "thread":
+            payload["sslopt"]["ssl_version"] = ssl.PROTOCOL_TLSv1_2
+            self.websocket_thread = threading.Thread(
+                target=self.websocket.run_forever, kwargs=payload)
+            self.websocket_thread.daemon = True
+            self.websocket_thread.start()
+        else:
+            self.websocket_thread = None
+            self.websocket_task = self.loop.create_task(
+                self.websocket.run_forever(**payload))
         while True:
             if global_value.check_websocket_if_error:
                 return False, global_value.websocket_error_reason
@@ -579,40 +677,62 @@ class QuotexAPI(object):
                 global_value.SSID = None
                 logger.debug("Websocket token rejected.")
                 return True, "Websocket token rejected."
+            await self.connection_event.wait()
+            self.connection_event.clear()
+
+    async def authorize(self, ssid=None, timeout=10):
+        """Send the session and wait for the server to accept or reject it.
 
-    def send_ssid(self, timeout=10):
+        Resolves on the `s_authorization` or `authorization/reject` answer and
+        records the outcome and latency in :attr:`authorization`.
+
+        :param ssid: The session token, `global_value.SSID` by default.
+        :param timeout: Seconds to wait for the answer.  (Default value = 10)
+        :returns: True if the server accepted the session.
+
+        """
+        ssid = ssid or global_value.SSID
+        if not ssid:
+            return False
+        started = time.perf_counter()
+        try:
+            accepted, message = await self.ssid(ssid, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No authorization answer within {timeout}s.")
+            accepted, message = False, None
+        except ConnectionError as e:
+            logger.warning(f"No authorization answer: {e}")
+            accepted, message = False, None
+        self.authorization = {
+            "accepted": accepted,
+            "latency": time.perf_counter() - started,
+            "message": message,
+        }
+        logger.debug(f"Authorization {'accepted' if accepted else 'rejected'} "
+                     f"in {self.authorization['latency']:.3f}s")
+        return accepted
+
+    async def send_ssid(self, timeout=10):
         """
 
         :param timeout:  (Default value = 10)
 
         """
-        self.wss_message = None
-        if not global_value.SSID:
-            return False
-        self.ssid(global_value.SSID)
-        start_time = time.time()
-        while self.wss_message is None:
-            if time.time() - start_time > timeout:
-                return False
-            time.sleep(0.5)
-        return True
+        return await self.authorize(timeout=timeout)
 
     async def connect(self, is_demo):
         """Method for connection to Quotex API."""
         self.account_type = is_demo
-        global_value.ssl_Mutual_exclusion = False
-        global_value.ssl_Mutual_exclusion_write = False
         if global_value.check_websocket_if_connect:
             logger.info("Closing websocket connection...")
             self.close()
         check_websocket, websocket_reason = await self.start_websocket()
         if not check_websocket:
             return check_websocket, websocket_reason
-        check_ssid = self.send_ssid()
-        if not check_ssid:
+        if not await self.authorize():
             await self.authenticate()
             if self.is_logged:
-                self.send_ssid()
+                await self.authorize()
         return check_websocket, websocket_reason
 
     async def reconnect(self):
@@ -622,14 +742,37 @@ class QuotexAPI(object):
 
     def close(self):
         """ """
+        if self.outbound:
+            self.outbound.stop()
         if self.websocket_client:
+            self.websocket_client.heartbeat.stop()
             self.websocket.close()
-            self.websocket_thread.join()
+            if self.websocket_thread is not None:
+                self.websocket_thread.join()
         return True
 
     def websocket_alive(self):
         """ """
-        return self.websocket_thread.is_alive()
+        if self.websocket_thread is not None:
+            return self.websocket_thread.is_alive()
+        return self.websocket_task is not None and not self.websocket_task.done()
+
+    def get_stats(self):
+        """Get the websocket pipeline counters."""
+        return {
+            "outbound": self.outbound.stats() if self.outbound else None,
+            "templates": self.templates.stats(),
+            "pending": self.pending.stats(),
+            "scheduler": self.scheduler.stats(),
+            "authorization": ({
+                "accepted": self.authorization["accepted"],
+                "latency": self.authorization["latency"],
+            } if self.authorization else None),
+            "heartbeat": (self.websocket_client.heartbeat.stats()
+                          if self.websocket_client else None),
+            "transport": (self.websocket.stats() if self.websocket_client
+                          and hasattr(self.websocket, "stats") else None),
+        }
 
     def generate_request_id(self):
         """ """
@@ -643,6 +786,13 @@ class QuotexAPI(object):
             request_id = generate_pseudo_random_id()
         return request_id
 
+    def generate_candles_index(self):
+        """Generate a `history/load` index not used by a pending request."""
+        index = expiration.get_timestamp()
+        while self.pending.get("history/load", index) is not None:
+            index += 1
+        return index
+
     def get_order_by_id(self,
                         order_id=None,
                         request_id=None) -> Optional[dict]:
@@ -653,11 +803,9 @@ class QuotexAPI(object):
 
         """
         if order_id is not None:
-            for request_id, order in self.orders.items():
-                if "id" in order and order["id"] == order_id:
-                    return order
-        elif request_id is not None:
-            return self.orders[request_id] if request_id in self.orders else None
+            request_id = self.order_ids.get(order_id)
+        if request_id is not None:
+            return self.orders.get(request_id)
 
         return None
 
@@ -667,9 +815,40 @@ class QuotexAPI(object):
         :param order_id:
 
         """
-        order = self.get_order_by_id(order_id=order_id)
+        return self.order_ids.get(order_id)
 
-        if order is not None:
-            return order["request"]["requestId"]
+    async def sleep_until(self, server_timestamp):
+        """Sleep until a server timestamp, ex. an order's `closeTimestamp`.
 
-        return None
+        The wakeup is scheduled once with :meth:`loop.call_at
+        <asyncio.loop.call_at>` on the monotonic loop clock, corrected by
+        the server clock offset, so waiting costs no periodic wakeups.
+
+        :param server_timestamp: The server time to wake up at.
+
+        """
+        loop = asyncio.get_running_loop()
+        delay = server_timestamp - self.timesync.server_now
+        future = loop.create_future()
+        handle = loop.call_at(loop.time() + max(delay, 0),
+                              future.set_result, None)
+        try:
+            await future
+        finally:
+            handle.cancel()
+
+    def get_result_future(self, order_id):
+        """Get a future resolved with the deal of `order_id` once it closes.
+
+        The future is shared by every caller waiting on the same order, so
+        wait on it with :func:`asyncio.wait` or :func:`asyncio.shield`.
+
+        :param order_id:
+
+        """
+        order = self.get_order_by_id(order_id=order_id)
+        if order is not None and "result" in order:
+            future = self.loop.create_future()
+            future.set_result(order["result"])
+            return future
+        return self.pending.add("deals", order_id)
@@ -1,12 +1,11 @@
 import asyncio
 import logging
+import math
 import time
-from datetime import datetime
 from typing import Optional
 
 from typing_extensions import deprecated
 
-from . import expiration
 from . import global_value
 from .api import QuotexAPI
 from .config import load_session
@@ -14,8 +13,9 @@ from .config import resource_path
 from .config import update_session
 from .constants import codes_asset
 from .constants import DEAL_STATUS_WIN
-from .expiration import get_timestamp
+from .utils.candle_cache import CandleCache
 from .utils.services import truncate
+from .ws.objects.candles import CandleArray
 
 __version__ = "1.0.0"
 logger = logging.getLogger(__name__)
@@ -38,6 +38,13 @@ class Quotex(object):
         user_data_dir="browser",
         asset_default="EURUSD",
         period_default=60,
+        ws_transport="asyncio",
+        json_backend="auto",
+        compression=True,
+        compression_options=None,
+        tick_interval=10.0,
+        candle_cache=None,
+        local_candles=False,
     ):
         self.size = [
             1,
@@ -67,6 +74,14 @@ class Quotex(object):
         self.user_data_dir = user_data_dir
         self.asset_default = asset_default
         self.period_default = period_default
+        self.ws_transport = ws_transport
+        self.json_backend = json_backend
+        self.compression = compression
+        self.compression_options = compression_options
+        self.tick_interval = tick_interval
+        self.candle_cache = (CandleCache(candle_cache)
+                             if candle_cache is not None else None)
+        self.local_candles = local_candles
         self.subscribe_candle = []
         self.subscribe_candle_all_size = []
         self.subscribe_mood = []
@@ -77,6 +92,7 @@ class Quotex(object):
         self.websocket_client = None
         self.websocket_thread = None
         self.debug_ws_enable = False
+        self.reconnect_lock = asyncio.Lock()
         self.resource_path = resource_path(root_path)
         session = load_session(user_agent)
         self.session_data = session
@@ -162,31 +178,163 @@ class Quotex(object):
                 self.api.current_asset = asset_name
                 return i[0], i[2].replace("\n", ""), i[14]
 
-    async def get_candles(self, asset, end_from_time, offset, period):
-        index = expiration.get_timestamp()
-        self.api.current_asset = asset
-        self.api.candles.candles_data = None
+    async def get_candles(self,
+                          asset,
+                          end_from_time,
+                          offset,
+                          period,
+                          timeout=None):
+        """Load candle history, requests are correlated by their `index`, so
+        any number of them can run concurrently on one connection. With a
+        `candle_cache` only the candles missing from it are requested."""
+        if self.candle_cache is not None:
+            candles = {
+                "asset": asset,
+                "period": period,
+                "data": await self.fetch_history(asset, period,
+                                                 end_from_time - offset,
+                                                 end_from_time, offset,
+                                                 timeout=timeout),
+            }
+            self.api.candles.candles_data = candles
+            return candles
         self.start_candles_stream(asset, period)
+        return await self._load_candles(asset, end_from_time, offset, period,
+                                        timeout)
+
+    async def _load_candles(self, asset, end_from_time, offset, period,
+                            timeout=None):
+        """
+
+        :param asset:
+        :param end_from_time:
+        :param offset:
+        :param period:
+        :param timeout:  (Default value = None)
+
+        """
         while True:
+            api = self.api
+            index = api.generate_candles_index()
+            future = api.get_candles(asset, index, end_from_time, offset,
+                                     period, timeout)
             try:
-                self.api.get_candles(asset, index, end_from_time, offset,
-                                     period)
-                while self.check_connect and self.api.candles.candles_data is None:
-                    await asyncio.sleep(0.1)
-                if self.api.candles.candles_data is not None:
-                    break
-            except:
+                candles = await future
+            except asyncio.TimeoutError:
+                return None
+            except ConnectionError:
                 logger.error("**error** get_candles need reconnect")
-                await self.connect()
-        return self.api.candles.candles_data
+                await self.reconnect(api)
+                self.start_candles_stream(asset, period)
+                continue
+            self.api.candles.candles_data = candles
+            return candles
+
+    async def reconnect(self, api):
+        """Replace a dropped connection, once for every request it failed.
+
+        Concurrent callers wait for the first one to reconnect, then find a
+        new :class:`QuotexAPI <quotexapi.api.QuotexAPI>` and just retry.
 
-    async def get_candle_v2(self, asset, period):
-        self.api.candle_v2_data[asset] = None
-        # self.stop_candles_stream(asset)
+        :param api: The :class:`QuotexAPI <quotexapi.api.QuotexAPI>` whose
+            connection dropped.
+
+        """
+        async with self.reconnect_lock:
+            if self.api is not api:
+                return
+            api.close()
+            await self.connect()
+
+    async def fetch_history(self,
+                            asset,
+                            period,
+                            start,
+                            end,
+                            window=None,
+                            max_in_flight=8,
+                            timeout=None):
+        """Load the candles of `[start, end)` as one time-sorted array.
+
+        The range is split into windows of `window` seconds loaded
+        concurrently, at most `max_in_flight` at a time, and candles returned
+        by more than one window are kept once. With a `candle_cache` only the
+        ranges missing from it are requested and closed candles are saved.
+
+        :param asset:
+        :param int period: The candle duration in seconds.
+        :param float start: The timestamp of the first candle.
+        :param float end: The timestamp the history ends at.
+        :param float window: Seconds per request, `period * 1000` when None.
+        :param int max_in_flight: The number of concurrent requests.
+        :param timeout: Seconds to wait for each window.
+        :returns: A :class:`CandleArray
+            <quotexapi.ws.objects.candles.CandleArray>`.
+        """
+        window = window or period * 1000
+        semaphore = asyncio.Semaphore(max_in_flight)
+        cache = self.candle_cache
+        # The candle still open changes until it closes, never cache it.
+        settled = int(self.api.timesync.server_now) // period * period
         self.start_candles_stream(asset, period)
-        while self.api.candle_v2_data[asset] is None:
-            await asyncio.sleep(0.1)
-        return self.api.candle_v2_data[asset]
+
+        async def load(window_start, window_end):
+            parts = []
+            # A response may hold fewer candles than asked for, ex. when the
+            # server caps them, so the part before its first candle is asked
+            # again until an empty answer.
+            while True:
+                async with semaphore:
+                    offset = math.ceil(window_end - window_start)
+                    candles = await self._load_candles(asset, window_end,
+                                                       offset, period, timeout)
+                if candles is None:
+                    logger.warning(f"History of {asset} before {window_end} "
+                                   f"was not loaded.")
+                    break
+                data = CandleArray.merge([candles.get("data") or ()]).between(
+                    window_start, window_end)
+                if not len(data):
+                    break
+                first = float(data.time[0])
+                if cache is not None:
+                    # Only what the candles show as downloaded is cached, a
+                    # start less than a candle before the first one holds none.
+                    covered = (window_start if first - window_start < period
+                               else first)
+                    cache.write(asset, period, data, covered,
+                                min(window_end, settled))
+                parts.append(data)
+                window_end = first
+                if window_end - window_start < period:
+                    break
+            return CandleArray.merge(parts)
+
+        gaps = (cache.missing(asset, period, start, end)
+                if cache is not None else [(start, end)])
+        windows = []
+        for gap_start, gap_end in gaps:
+            window_end = gap_end
+            while window_end > gap_start:
+                windows.append((max(gap_start, window_end - window),
+                                window_end))
+                window_end -= window
+        parts = await asyncio.gather(*(load(*bounds) for bounds in windows))
+        if cache is not None:
+            parts = [cache.read(asset, period, start, end), *parts]
+        return CandleArray.merge(parts).between(start, end)
+
+    async def get_candle_v2(self, asset, period, timeout=None):
+        """Wait for the next `history/list/v2` of `asset`, calls for different
+        assets complete in parallel."""
+        future = self.api.pending.add("history/list/v2", asset, timeout)
+        self.start_candles_stream(asset, period)
+        try:
+            # Shared by every call for the asset, one caller being cancelled
+            # must not cancel the others.
+            return await asyncio.shield(future)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
 
     async def connect(self):
         self.api = QuotexAPI(
@@ -200,12 +348,18 @@ class Quotex(object):
             imap_server_port=self.imap_server_port,
             resource_path=self.resource_path,
             user_data_dir=self.user_data_dir,
+            ws_transport=self.ws_transport,
+            json_backend=self.json_backend,
+            compression=self.compression,
+            compression_options=self.compression_options,
+            tick_interval=self.tick_interval,
         )
         await self.api.logout()
         self.api.trace_ws = self.debug_ws_enable
         self.api.session_data = self.session_data
         self.api.current_asset = self.asset_default
         self.api.current_period = self.period_default
+        self.api.candle_periods = self.size if self.local_candles else None
         global_value.SSID = self.session_data.get("token")
         check, reason = await self.api.connect(self.account_is_demo)
         if check:
@@ -238,20 +392,53 @@ class Quotex(object):
         self.account_is_demo = 0 if balance_mode.upper() == "REAL" else 1
         self.api.change_account_type(self.account_is_demo)
 
-    async def edit_practice_balance(self, amount=10000):
-        self.api.training_balance_edit_request = None
-        self.api.refill_demo_balance(amount)
-        while self.api.training_balance_edit_request is None:
-            await asyncio.sleep(0.1)
-        return self.api.training_balance_edit_request
+    async def edit_practice_balance(self, amount=10000, timeout=None):
+        try:
+            return await self.api.refill_demo_balance(amount, timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
 
-    async def get_balance(self):
-        while self.api.account_balance is None:
-            await asyncio.sleep(0.1)
-        balance = (self.api.account_balance.get("demoBalance")
+    @property
+    def balance(self):
+        """Latest balance of the current account, None before the first
+        update from the server."""
+        return self.get_account_balance(self.api.account_balance)
+
+    def get_account_balance(self, account_balance):
+        """
+
+        :param account_balance: A balance message from the server.
+
+        """
+        if account_balance is None:
+            return None
+        balance = (account_balance.get("demoBalance")
                    if self.api.account_type > 0 else
-                   self.api.account_balance.get("liveBalance"))
-        return float(f"{truncate(balance + self.get_profit(), 2):.2f}")
+                   account_balance.get("liveBalance"))
+        return float(f"{truncate(balance, 2):.2f}")
+
+    async def get_balance(self):
+        watcher = self.watch_balance()
+        try:
+            return await anext(watcher)
+        finally:
+            await watcher.aclose()
+
+    async def watch_balance(self):
+        """Yield the balance of the current account, the cached one first
+        and then every update pushed by the server.
+
+        `async for balance in client.watch_balance(): ...`
+        """
+        queue = asyncio.Queue(maxsize=1)
+        self.api.balance_watchers.append(queue)
+        try:
+            if self.api.account_balance is not None:
+                yield self.balance
+            while True:
+                yield self.get_account_balance(await queue.get())
+        finally:
+            self.api.balance_watchers.remove(queue)
 
     async def get_profile(self):
         return await self.api.get_profile()
@@ -263,53 +450,92 @@ class Quotex(object):
         direction: str,
         duration: int,
         tournament_id: int = 0,
+        timeout: float = None,
     ):
-        """Buy Binary option"""
+        """Buy Binary option
+
+        Waits for the `purchaseTime` acknowledgement of this order's requestId,
+        up to `timeout` seconds, `duration` by default.
+        """
         request_id = self.api.generate_request_id()
         self.api.buy_id = None
         self.api.current_asset = asset
         self.api.timesync.server_timestamp = time.time()
-        self.api.simulate_asset_switch(asset, duration)
-        self.api.buy(amount, asset, direction, duration, request_id,
-                     tournament_id)
-        count = 0.1
-        while "response" not in self.api.orders[request_id]:
-            count += 0.1
-            if count > duration:
-                status = False
-                break
-            await asyncio.sleep(0.1)
-            if global_value.check_websocket_if_error:
-                return False, global_value.websocket_error_reason
-        else:
+        future = self.api.buy(amount, asset, direction, duration, request_id,
+                              tournament_id, timeout or duration)
+        try:
+            await future
             status = True
+        except asyncio.TimeoutError:
+            status = False
+        except RuntimeError:
+            return False, global_value.websocket_error_reason
+        except (ConnectionError, ValueError) as e:
+            return False, str(e)
         return status, self.api.orders[request_id]
 
     async def wait_then_buy(
         self,
-        buy_timestamp: int,
+        buy_timestamp: float,
         asset: str,
         amount: float,
         direction: str,
         duration: int,
         tournament_id: int = 0,
+        timeout: float = None,
     ):
-        now = get_timestamp()
-        time_diff = buy_timestamp - now
-        if time_diff > 0:
-            while time_diff > 0:
-                time_diff -= 1
-                await asyncio.sleep(1)
-        return await self.buy(amount, asset, direction, duration,
-                              tournament_id)
-
-    async def sell_option(self, options_ids):
+        """Buy Binary option at a server timestamp.
+
+        The asset switch and the order frame are prepared ahead of time and
+        the frame is sent at `buy_timestamp` with millisecond precision on the
+        estimated server clock. The error against that clock is kept in the
+        order's "send_error", None when the clock was not synced yet by
+        realtime quotes (see :attr:`TimeSync.synced
+        <quotexapi.ws.objects.timesync.TimeSync.synced>`).
+        """
+        request_id = self.api.generate_request_id()
+        self.api.buy_id = None
+        self.api.current_asset = asset
+        future, _ = await self.api.scheduler.submit(
+            buy_timestamp, amount, asset, direction, duration, request_id,
+            tournament_id, timeout or duration)
+        try:
+            await future
+            status = True
+        except asyncio.TimeoutError:
+            status = False
+        except RuntimeError:
+            return False, global_value.websocket_error_reason
+        except (ConnectionError, ValueError) as e:
+            return False, str(e)
+        return status, self.api.orders[request_id]
+
+    async def sell_option(self, options_ids, timeout=None):
         """Sell asset Quotex"""
-        self.api.sell_option(options_ids)
-        self.api.sold_options_respond = None
-        while self.api.sold_options_respond is None:
-            await asyncio.sleep(0.1)
-        return self.api.sold_options_respond
+        if type(options_ids) == list:
+            return await self.sell_options(options_ids, timeout)
+        results = await self.sell_options([options_ids], timeout)
+        return results[options_ids]
+
+    async def sell_options(self, options_ids, timeout=None):
+        """Sell many options at once, the cancel frames are pipelined and each
+        response is matched to its ticket.
+
+        :param options_ids: The tickets to sell.
+        :param timeout: Seconds to wait, None waits for every response.
+        :returns: A dict of ticket to its `orders/cancel` response, None for
+            those without a response after `timeout` or when the connection
+            is lost.
+        """
+        if not options_ids:
+            return {}
+        futures = self.api.sell_option(list(options_ids), timeout)
+        await asyncio.wait(futures.values())
+        return {
+            ticket: (None if future.cancelled() or future.exception()
+                     else future.result())
+            for ticket, future in futures.items()
+        }
 
     def get_payment(self):
         """Payment Quotex server"""
@@ -329,46 +555,49 @@ class Quotex(object):
 
     @deprecated("Use `start_remaining_time(...)` instead")
     async def start_remaing_time(self):
-        now_stamp = datetime.fromtimestamp(expiration.get_timestamp())
-        expiration_stamp = datetime.fromtimestamp(
-            self.api.timesync.server_timestamp)
-        remaining_time = int((expiration_stamp - now_stamp).total_seconds())
-        while remaining_time >= 0:
-            remaining_time -= 1
-            print(
-                f"\rRestando {remaining_time if remaining_time > 0 else 0} segundos ...",
-                end="",
-            )
-            await asyncio.sleep(1)
-        await asyncio.sleep(5)
+        remaining_time = int(self.api.timesync.server_timestamp -
+                             self.api.timesync.server_now)
+        print(f"\rRestando {max(remaining_time, 0)} segundos ...", end="")
+        await self.api.sleep_until(self.api.timesync.server_timestamp + 5)
 
     async def start_remaining_time(self, order_id):
         order = self.api.get_order_by_id(order_id)
         if order:
-            now_ts = expiration.get_timestamp()
-            expiration_ts = int(order["response"]["closeTimestamp"]) + 5
-            remaining_time = expiration_ts - now_ts
             print(
                 f"Waiting for {order['response']['asset']} until {order['response']['closeTime']}..."
             )
-            while remaining_time >= 0:
-                remaining_time -= 1
-                await asyncio.sleep(1)
+            await self.api.sleep_until(
+                int(order["response"]["closeTimestamp"]) + 5)
             return True
         return False
 
-    async def check_win(self, order_id):
-        """Check win based on order id"""
-        awaited_remaining_time = await self.start_remaining_time(order_id)
-        if awaited_remaining_time:
-            request_id = self.api.get_request_id_from_order_id(order_id)
-            if request_id:
-                while True:
-                    order = self.api.get_order_by_id(request_id=request_id)
-                    if "status" in order:
-                        return order["status"] == DEAL_STATUS_WIN
+    async def check_win(self, order_id, timeout=None):
+        """Check win based on order id, waiting for the deal to close."""
+        results = await self.wait_results([order_id], timeout)
+        return results[order_id] == DEAL_STATUS_WIN
 
-        return False
+    async def wait_results(self, order_ids, timeout=None):
+        """Wait for the deals of many open options at once.
+
+        :param order_ids: The ids of the orders to wait for.
+        :param timeout: Seconds to wait, None waits until every deal closes.
+        :returns: A dict of order id to its `DEAL_STATUS_*`, None for the
+            unknown orders and those still open after `timeout` or when the
+            connection is lost.
+        """
+        futures = {}
+        for order_id in order_ids:
+            if self.api.get_request_id_from_order_id(order_id) is not None:
+                futures[order_id] = self.api.get_result_future(order_id)
+        if futures:
+            await asyncio.wait(futures.values(), timeout=timeout)
+        results = dict.fromkeys(order_ids)
+        for order_id, future in futures.items():
+            if (future.done() and not future.cancelled()
+                    and future.exception() is None):
+                results[order_id] = self.api.get_order_by_id(
+                    order_id=order_id).get("status")
+        return results
 
     def start_candles_stream(self, asset, period=0):
         """
@@ -393,8 +622,9 @@ class Quotex(object):
         """ """
         self.api.signals_subscribe()
 
-    def get_realtime_candles(self, asset):
-        """
+    async def get_realtime_candles(self, asset):
+        """Wait for the first realtime price of `asset`, frames are read on
+        the event loop so it must not be blocked while waiting.
 
         :param asset:
 
@@ -402,7 +632,7 @@ class Quotex(object):
         while True:
             if self.api.realtime_price.get(asset):
                 return self.api.realtime_price
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
 
     async def start_realtime_price(self, asset: str, period: int = 0):
         self.start_candles_stream(asset, period)
@@ -414,6 +644,34 @@ class Quotex(object):
     async def get_realtime_price(self, asset: str):
         return self.api.realtime_price.get(asset, {})
 
+    def start_local_candles(self):
+        """Aggregate the realtime prices into candles of every period of
+        :attr:`size`, started by the first `get_local_candle*` call unless
+        `local_candles` was passed."""
+        self.local_candles = True
+        if self.api.candle_periods is None:
+            self.api.candle_periods = self.size
+
+    def get_local_candle(self, asset: str, period: int):
+        """Get the candle being built from the realtime prices of `asset`.
+
+        :returns: A candle dict, or None before the first price.
+        """
+        self.start_local_candles()
+        aggregator = self.api.candle_aggregators.get(asset)
+        return aggregator.current(period) if aggregator else None
+
+    def get_local_candles(self, asset: str, period: int, n: int = None):
+        """Get the candles closed since the realtime prices of `asset` started,
+        aggregated locally for every period of :attr:`size`.
+
+        :returns: A read-only structured array with time, open, close, high,
+            low and ticks columns, oldest first, or None before the first price.
+        """
+        self.start_local_candles()
+        aggregator = self.api.candle_aggregators.get(asset)
+        return aggregator.closed(period, n) if aggregator else None
+
     async def start_realtime_sentiment(self, asset: str, period: int = 0):
         self.start_candles_stream(asset, period)
         while True:
@@ -489,6 +747,10 @@ class Quotex(object):
             finally:
                 await asyncio.sleep(0.1)
 
+    def get_stats(self):
+        """Get the websocket pipeline counters."""
+        return self.api.get_stats()
+
     def close(self):
         """ """
         return self.api.close()
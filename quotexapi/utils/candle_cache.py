@@ -0,0 +1,163 @@
+"""Module for Quotex on-disk candle history cache."""
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from ..ws.objects.candles import CANDLE_DTYPE
+from ..ws.objects.candles import CANDLE_FIELDS
+from ..ws.objects.candles import CandleArray
+
+logger = logging.getLogger(__name__)
+
+RANGE_DTYPE = np.dtype([("start", np.float64), ("end", np.float64)])
+
+
+class CandleCache(object):
+    """Persistent candle history keyed by asset and period.
+
+    Every `(asset, period)` is a directory holding one append-only file per
+    candle column, ex. `EURUSD/60/close.bin`, plus `ranges.bin` with the time
+    ranges already downloaded, so a gap between candles (ex. a closed market)
+    is not requested again. Files are read through memory maps and only
+    written by appending, a write cut short is ignored on the next read.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The directory of the cache.
+        """
+        self.path = Path(path)
+
+    def _directory(self, asset, period):
+        """
+
+        :param asset:
+        :param period:
+
+        """
+        return self.path / asset.replace("/", "_") / str(int(period))
+
+    @staticmethod
+    def _map(path, dtype):
+        """
+
+        :param path:
+        :param dtype:
+
+        """
+        try:
+            size = path.stat().st_size // dtype.itemsize
+        except FileNotFoundError:
+            return np.zeros(0, dtype=dtype)
+        if not size:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(size,))
+
+    def ranges(self, asset, period):
+        """Get the downloaded time ranges, sorted and merged.
+
+        :param asset:
+        :param int period:
+        :returns: A list of `(start, end)` tuples.
+        """
+        stored = self._map(self._directory(asset, period) / "ranges.bin",
+                           RANGE_DTYPE)
+        merged = []
+        for start, end in sorted(stored.tolist()):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def missing(self, asset, period, start, end):
+        """Get the parts of `[start, end)` not downloaded yet.
+
+        :param asset:
+        :param int period:
+        :param float start:
+        :param float end:
+        :returns: A list of `(start, end)` tuples.
+        """
+        gaps = []
+        for cached_start, cached_end in self.ranges(asset, period):
+            if cached_end <= start:
+                continue
+            if cached_start >= end:
+                break
+            if cached_start > start:
+                gaps.append((start, cached_start))
+            start = max(start, cached_end)
+        if start < end:
+            gaps.append((start, end))
+        return gaps
+
+    def read(self, asset, period, start=None, end=None):
+        """Get the cached candles of `[start, end)`, sorted by time.
+
+        :param asset:
+        :param int period:
+        :param float start:  (Default value = None)
+        :param float end:  (Default value = None)
+        :returns: A :class:`CandleArray
+            <quotexapi.ws.objects.candles.CandleArray>`.
+        """
+        directory = self._directory(asset, period)
+        columns = {
+            name: self._map(directory / f"{name}.bin", CANDLE_DTYPE[name])
+            for name in CANDLE_FIELDS
+        }
+        # Appends are column by column, ignore a row not written to all.
+        size = min(len(column) for column in columns.values())
+        times = columns["time"][:size]
+        mask = np.ones(size, dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times < end
+        data = np.empty(int(mask.sum()), dtype=CANDLE_DTYPE)
+        for name, column in columns.items():
+            data[name] = column[:size][mask]
+        _, first = np.unique(data["time"], return_index=True)
+        return CandleArray(data[first])
+
+    @staticmethod
+    def _align(directory):
+        """Drop the row of an append cut short, so columns stay in step.
+
+        :param directory:
+
+        """
+        paths = [directory / f"{name}.bin" for name in CANDLE_FIELDS]
+        sizes = [path.stat().st_size if path.exists() else 0 for path in paths]
+        size = min(sizes) // 8 * 8
+        for path, path_size in zip(paths, sizes):
+            if path_size > size:
+                with open(path, "r+b") as file:
+                    file.truncate(size)
+
+    def write(self, asset, period, candles, start, end):
+        """Append downloaded candles and mark `[start, end)` as cached.
+
+        :param asset:
+        :param int period:
+        :param candles: The :class:`CandleArray
+            <quotexapi.ws.objects.candles.CandleArray>` of the range.
+        :param float start:
+        :param float end:
+
+        """
+        if end <= start:
+            return
+        data = candles.between(start, end).data
+        directory = self._directory(asset, period)
+        directory.mkdir(parents=True, exist_ok=True)
+        if len(data):
+            self._align(directory)
+            for name in CANDLE_FIELDS:
+                with open(directory / f"{name}.bin", "ab") as file:
+                    file.write(np.ascontiguousarray(data[name]).tobytes())
+        with open(directory / "ranges.bin", "ab") as file:
+            file.write(np.array([(start, end)], dtype=RANGE_DTYPE).tobytes())
+        logger.debug(f"Cached {len(data)} {asset} candles of {period}s.")
@@ -0,0 +1,98 @@
+"""Module for Quotex API JSON backends."""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JsonBackend(object):
+    """JSON backend on top of the standard library `json` module.
+
+    `loads` accepts `str` or `bytes`, so binary frames are decoded without a
+    `.decode()` round trip, and `dumps` returns compact JSON text.
+    """
+
+    name = "json"
+
+    def __init__(self):
+        self.loads = json.loads
+        self.dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class OrjsonBackend(JsonBackend):
+    """JSON backend using `orjson`."""
+
+    name = "orjson"
+
+    def __init__(self):
+        super().__init__()
+        self.loads = orjson.loads
+        self.dumps = self._dumps
+
+    @staticmethod
+    def _dumps(obj):
+        """
+
+        :param obj:
+
+        """
+        return orjson.dumps(obj).decode()
+
+
+class MsgspecBackend(JsonBackend):
+    """JSON backend using `msgspec`."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        super().__init__()
+        self.decoder = msgspec.json.Decoder()
+        self.encoder = msgspec.json.Encoder()
+        self.loads = self.decoder.decode
+        self.dumps = self._dumps
+
+    def _dumps(self, obj):
+        """
+
+        :param obj:
+
+        """
+        return self.encoder.encode(obj).decode()
+
+
+json_backends = {
+    "orjson": (OrjsonBackend, lambda: orjson is not None),
+    "msgspec": (MsgspecBackend, lambda: msgspec is not None),
+    "json": (JsonBackend, lambda: True),
+}
+
+
+def get_json_backend(name="auto"):
+    """Get a JSON backend by name.
+
+    :param str name: "orjson", "msgspec", "json" or "auto" to pick the fastest
+        one installed.  (Default value = "auto")
+    :returns: The instance of :class:`JsonBackend`.
+
+    """
+    if isinstance(name, JsonBackend):
+        return name
+    if name == "auto":
+        for backend, available in json_backends.values():
+            if available():
+                return backend()
+    if name not in json_backends:
+        raise ValueError(
+            f"Unknown JSON backend {name!r}, use one of: auto, {', '.join(json_backends)}"
+        )
+    backend, available = json_backends[name]
+    if not available():
+        raise ImportError(f"JSON backend {name!r} is not installed.")
+    return backend()
@@ -0,0 +1,131 @@
+"""Module for Quotex local tick to OHLC aggregation."""
+import numpy as np
+
+from ..ws.objects.candles import CANDLE_DTYPE
+
+
+class PeriodBars(object):
+    """Current and recently closed bars of one period.
+
+    The bar being built lives in plain attributes, closed bars go to a
+    mirrored ring of :data:`CANDLE_DTYPE` rows so the latest ones are always
+    one contiguous, zero-copy slice.
+    """
+
+    __slots__ = ("period", "capacity", "bars", "head", "size", "start", "open",
+                 "high", "low", "close", "ticks")
+
+    def __init__(self, period, capacity=500):
+        """
+        :param int period: The bar duration in seconds.
+        :param int capacity: The number of closed bars kept.
+        """
+        self.period = period
+        self.capacity = capacity
+        self.bars = np.zeros(2 * capacity, dtype=CANDLE_DTYPE)
+        self.head = 0
+        self.size = 0
+        self.start = None
+        self.open = self.high = self.low = self.close = None
+        self.ticks = 0
+
+    def update(self, time, price):
+        """Fold a tick into the current bar, closing it on a new period.
+
+        :param float time: The tick timestamp.
+        :param float price: The tick price.
+
+        """
+        start = time - time % self.period
+        if self.start is None or start > self.start:
+            if self.ticks:
+                self._close()
+            self.start = start
+            self.open = self.high = self.low = self.close = price
+            self.ticks = 1
+            return
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.ticks += 1
+
+    def _close(self):
+        """ """
+        row = (self.start, self.open, self.close, self.high, self.low,
+               self.ticks)
+        head = self.head
+        self.bars[head] = self.bars[head + self.capacity] = row
+        self.head = head + 1 if head + 1 < self.capacity else 0
+        if self.size < self.capacity:
+            self.size += 1
+
+    def current(self):
+        """Get the bar being built.
+
+        :returns: A candle dict, or None before the first tick.
+        """
+        if not self.ticks:
+            return None
+        return {
+            "time": self.start,
+            "open": self.open,
+            "close": self.close,
+            "high": self.high,
+            "low": self.low,
+            "ticks": self.ticks,
+        }
+
+    def closed(self, n=None):
+        """Get the latest closed bars as a read-only view, oldest first.
+
+        :param int n: The number of bars, all of them when None.
+
+        """
+        end = self.head + self.capacity
+        n = self.size if n is None else max(0, min(n, self.size))
+        bars = self.bars[end - n:end]
+        bars.flags.writeable = False
+        return bars
+
+
+class OhlcAggregator(object):
+    """Incremental OHLC bars of one asset for many periods at once."""
+
+    def __init__(self, periods, capacity=500):
+        """
+        :param periods: The bar durations in seconds, ex. `Quotex.size`.
+        :param int capacity: The number of closed bars kept per period.
+        """
+        self.periods = {
+            period: PeriodBars(period, capacity) for period in periods
+        }
+        self._bars = tuple(self.periods.values())
+
+    def update(self, time, price):
+        """Fold a tick into the bars of every period.
+
+        :param float time: The tick timestamp.
+        :param float price: The tick price.
+
+        """
+        for bars in self._bars:
+            bars.update(time, price)
+
+    def current(self, period):
+        """Get the bar being built for a period.
+
+        :param int period:
+
+        """
+        return self.periods[period].current()
+
+    def closed(self, period, n=None):
+        """Get the latest closed bars of a period.
+
+        :param int period:
+        :param int n: The number of bars, all of them when None.
+
+        """
+        return self.periods[period].closed(n)
@@ -0,0 +1,116 @@
+"""Module for Quotex realtime price ring buffer."""
+import numpy as np
+
+
+class PriceBuffer(object):
+    """Fixed-capacity circular buffer of realtime prices.
+
+    Times and prices are kept in float64 columns written twice, at `i` and
+    `i + capacity`, so the latest `n` ticks are always one contiguous slice
+    and :meth:`last` returns views without copying. Reading it as a sequence
+    yields `{"time": ..., "price": ...}` dicts like the former list.
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        :param int capacity: The number of ticks kept, older ones are dropped.
+        """
+        self.capacity = capacity
+        self.times = np.zeros(2 * capacity, dtype=np.float64)
+        self.prices = np.zeros(2 * capacity, dtype=np.float64)
+        self.head = 0
+        self.size = 0
+
+    def push(self, time, price):
+        """Add a tick, dropping the oldest one when full.
+
+        :param float time: The tick timestamp.
+        :param float price: The tick price.
+
+        """
+        head = self.head
+        mirror = head + self.capacity
+        self.times[head] = self.times[mirror] = time
+        self.prices[head] = self.prices[mirror] = price
+        self.head = head + 1 if head + 1 < self.capacity else 0
+        if self.size < self.capacity:
+            self.size += 1
+
+    def append(self, tick):
+        """Add a `{"time": ..., "price": ...}` tick.
+
+        :param dict tick:
+
+        """
+        self.push(tick["time"], tick["price"])
+
+    def clear(self):
+        """ """
+        self.head = 0
+        self.size = 0
+
+    def _window(self, n=None):
+        """
+
+        :param n:  (Default value = None)
+
+        """
+        end = self.head + self.capacity
+        n = self.size if n is None else max(0, min(n, self.size))
+        return slice(end - n, end)
+
+    def last(self, n=None):
+        """Get the latest ticks as read-only views, oldest first.
+
+        The views share memory with the buffer, so ticks pushed later
+        overwrite them; copy them to keep a snapshot.
+
+        :param int n: The number of ticks, all of them when None.
+        :returns: The times and prices arrays.
+        """
+        window = self._window(n)
+        times = self.times[window]
+        prices = self.prices[window]
+        times.flags.writeable = False
+        prices.flags.writeable = False
+        return times, prices
+
+    @property
+    def last_price(self):
+        """Property to get the latest price, None when empty."""
+        if not self.size:
+            return None
+        return float(self.prices[self.head + self.capacity - 1])
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        window = self._window()
+        if isinstance(index, slice):
+            return [self._tick(window.start + i)
+                    for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("PriceBuffer index out of range")
+        return self._tick(window.start + index)
+
+    def __iter__(self):
+        window = self._window()
+        for position in range(window.start, window.stop):
+            yield self._tick(position)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def _tick(self, position):
+        """
+
+        :param position:
+
+        """
+        return {
+            "time": float(self.times[position]),
+            "price": float(self.prices[position]),
+        }
@@ -1,7 +1,6 @@
-import json
-
 from quotexapi.expiration import get_expiration_time_quotex
 from quotexapi.ws.channels.base import Base
+from quotexapi.ws.templates import volatile
 
 
 class Buy(Base):
@@ -15,15 +14,34 @@ class Buy(Base):
                  direction,
                  duration,
                  request_id=None,
-                 tournament_id=0):
+                 tournament_id=0,
+                 timeout=None):
+        self.api.simulate_asset_switch(asset, duration)
+        frame, payload = self.prepare(price, asset, direction, duration,
+                                      request_id, tournament_id)
+        return self.send(frame, payload, timeout)
+
+    def prepare(self,
+                price,
+                asset,
+                direction,
+                duration,
+                request_id=None,
+                tournament_id=0,
+                timestamp=None):
+        """Encode an order without sending it.
+
+        :param timestamp: The server time the order is sent at, the
+            expiration is computed from it.  (Default value = None)
+        :returns: The frame and the payload for :meth:`send`.
+        """
         _duration = duration
         option_type = 100
         if "_otc" not in asset:
             option_type = 1
-            duration = get_expiration_time_quotex(
-                int(self.api.timesync.server_timestamp), _duration)
-
-        self.api.simulate_asset_switch(asset, _duration)
+            if timestamp is None:
+                timestamp = self.api.timesync.server_timestamp
+            duration = get_expiration_time_quotex(int(timestamp), _duration)
 
         payload = {
             "asset": asset,
@@ -36,6 +54,37 @@ class Buy(Base):
             "optionType": option_type,
         }
         wss_action = "orders/tournament/open" if tournament_id > 0 else "orders/open"
-        self.send_wss_payload(wss_action, payload)
+        # Only the amount, expiration and request id change between orders on
+        # the same asset and direction, the rest of the frame is cached.
+        key = (asset, direction, payload["isDemo"], tournament_id, option_type)
+        frame = self.api.templates.render(
+            wss_action, key,
+            lambda: {
+                **payload,
+                "amount": volatile("amount"),
+                "time": volatile("time"),
+                "requestId": volatile("request_id"),
+            },
+            amount=price, time=duration, request_id=request_id)
+        return frame, payload
+
+    def send(self, frame, payload, timeout=None, no_force_send=True):
+        """Register and send an order encoded by :meth:`prepare`.
+
+        :param frame: The encoded order.
+        :param payload: The order payload.
+        :param timeout: Seconds to wait for the acknowledgement.
+        :param no_force_send: False writes the frame to the socket right away
+            instead of queueing it.  (Default value = True)
+        :returns: The future resolved with the `purchaseTime` message, or
+            failed with :class:`ValueError` when the frame was refused.
+        """
+        request_id = payload["requestId"]
         self.api.orders[request_id] = {}
         self.api.orders[request_id]["request"] = payload
+        future = self.api.pending.add("orders/open", request_id, timeout)
+        try:
+            self.api.send_websocket_request(frame, no_force_send)
+        except ValueError as e:
+            self.api.pending.fail("orders/open", request_id, e)
+        return future
@@ -1,4 +1,3 @@
-import json
 from quotexapi.ws.channels.base import Base
 
 
@@ -7,7 +6,7 @@ class GetCandles(Base):
 
     name = "candles"
 
-    def __call__(self, asset, index, time, offset, period):
+    def __call__(self, asset, index, time, offset, period, timeout=None):
         """Method to send message to candles websocket chanel.
 
         :param asset: The active/asset identifier.
@@ -15,6 +14,8 @@ class GetCandles(Base):
         :param time: The time of candles.
         :param offset: The number of candles you want to have
         :param period: The candle duration (timeframe for the candles).
+        :param timeout: Seconds to wait for the history.
+        :returns: The future resolved with the history of this `index`.
         """
         payload = {
             "asset": asset,
@@ -23,5 +24,9 @@ class GetCandles(Base):
             "offset": offset,
             "period": period
         }
-        data = f'42["history/load",{json.dumps(payload)}]'
-        self.send_websocket_request(data)
+        future = self.api.pending.add("history/load", index, timeout)
+        try:
+            self.send_wss_payload("history/load", payload)
+        except ValueError as e:
+            self.api.pending.fail("history/load", index, e)
+        return future
@@ -1,5 +1,5 @@
-import json
 from quotexapi.ws.channels.base import Base
+from quotexapi.ws.templates import volatile
 
 
 class SellOption(Base):
@@ -7,18 +7,27 @@ class SellOption(Base):
 
     name = "sell_option"
 
-    def __call__(self, options_ids):
+    def __call__(self, options_ids, timeout=None):
         """
         :param options_ids: list or int
+        :param timeout: Seconds to wait for each response.
+        :returns: A dict of ticket to the future resolved with its response.
         """
         if type(options_ids) != list:
-            payload = {
-                "ticket": options_ids
-            }
-            self.send_websocket_request(f'42["orders/cancel",{json.dumps(payload)}]')
-        else:
-            for ids in options_ids:
-                payload = {
-                    "ticket": ids
-                }
-                self.send_websocket_request(f'42["orders/cancel",{json.dumps(payload)}]')
+            options_ids = [options_ids]
+        futures = {
+            ticket: self.api.pending.add("orders/cancel", ticket, timeout)
+            for ticket in options_ids
+        }
+        # Every frame is queued before the writer runs, so the whole batch
+        # goes out in one socket write.
+        for ticket in options_ids:
+            try:
+                self.send_websocket_request(
+                    self.api.templates.render(
+                        "orders/cancel",
+                        build=lambda: {"ticket": volatile("ticket")},
+                        ticket=ticket))
+            except ValueError as e:
+                self.api.pending.fail("orders/cancel", ticket, e)
+        return futures
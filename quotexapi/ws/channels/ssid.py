@@ -1,5 +1,3 @@
-import json
-
 from quotexapi.ws.channels.base import Base
 
 
@@ -8,16 +6,24 @@ class Ssid(Base):
 
     name = "ssid"
 
-    def __call__(self, ssid):
+    def __call__(self, ssid, timeout=None):
         """Method to send message to ssid websocket channel.
 
         :param ssid: The session identifier.
+        :param timeout: Seconds to wait for the server answer.
+        :returns: The future resolved with `(accepted, message)` once the
+            server accepts or rejects the session.
         """
-        self.send_wss_payload(
-            "authorization",
-            {
-                "session": ssid,
-                "isDemo": self.api.account_type,
-                "tournamentId": 0
-            },
-        )
+        future = self.api.pending.add("authorization", timeout=timeout)
+        try:
+            self.send_wss_payload(
+                "authorization",
+                {
+                    "session": ssid,
+                    "isDemo": self.api.account_type,
+                    "tournamentId": 0
+                },
+            )
+        except ValueError as e:
+            self.api.pending.fail("authorization", exception=e)
+        return future
@@ -1,14 +1,23 @@
 """Module for Quotex websocket."""
-import asyncio
-import json
 import logging
-import time
 
 import websocket
 
 from .. import global_value
 from ..constants import DEAL_STATUS_LOSS
 from ..constants import DEAL_STATUS_WIN
+from ..utils.ohlc import OhlcAggregator
+from ..utils.ring_buffer import PriceBuffer
+from .codec import Decoder
+from .codec import EIO_MESSAGE
+from .codec import EIO_OPEN
+from .codec import EIO_PONG
+from .codec import EVENT_TYPES
+from .codec import SIO_BINARY_EVENT
+from .codec import SIO_DISCONNECT
+from .heartbeat import Heartbeat
+from .objects.candles import CandleArray
+from .transport import AsyncWebSocketApp
 
 logger = logging.getLogger(__name__)
 
@@ -36,153 +45,381 @@ class WebsocketClient(object):
             "Sec-Fetch-Mode": "websocket",
             "Sec-Fetch-Site": "same-site",
             "Sec-GPC": "1",
-            "Sec-WebSocket-Extensions": "permessage-deflate; client_max_window_bits",
             "Upgrade": "websocket",
             "User-Agent": self.api.session_data.get("user_agent")
         }
 
-        websocket.enableTrace(self.api.trace_ws)
-        self.wss = websocket.WebSocketApp(
-            self.api.wss_url,
-            on_message=self.on_message,
-            on_error=self.on_error,
-            on_close=self.on_close,
-            on_open=self.on_open,
-            on_ping=self.on_ping,
-            on_pong=self.on_pong,
-            header=self.headers,
-            cookie=self.api.session_data.get("cookies"),
+        self.heartbeat = Heartbeat(
+            lambda: self.api.send_websocket_request("2"),
+            # The timer already paces the ticks, don't rate-limit them again.
+            lambda: self.api.tick(force=True),
+            self.api.tick_interval,
+            self.on_heartbeat_timeout,
         )
+        self.decoder = Decoder(loads=self.api.json_backend.loads,
+                               binary_loads=self.api.json_backend.loads)
+        self.event_handlers = {
+            "s_authorization": self.on_authorization,
+            "authorization/reject": self.on_authorization_reject,
+            "instruments/list": self.on_instruments,
+            "settings/list": self.on_settings_list,
+            "history/list/v2": self.on_history_list,
+        }
+        self.payload_handlers = (
+            ("signals", self.on_signals),
+            ("liveBalance", self.on_balance),
+            ("demoBalance", self.on_balance),
+            ("index", self.on_candles),
+            ("purchaseTime", self.on_order_opened),
+            ("ticket", self.on_option_sold),
+            ("deals", self.on_deals),
+            ("isDemo", self.on_demo_refill),
+            ("error", self.on_error_message),
+        )
+        callbacks = {
+            "on_message": self.on_message,
+            "on_error": self.on_error,
+            "on_close": self.on_close,
+            "on_open": self.on_open,
+            "on_ping": self.on_ping,
+            "on_pong": self.on_pong,
+        }
+        if self.api.ws_transport == "thread":
+            # `websocket-client` cannot inflate frames, so compression is
+            # never offered through the threaded transport.
+            if self.api.compression:
+                logger.warning(
+                    "permessage-deflate is not supported by the thread transport.")
+            websocket.enableTrace(self.api.trace_ws)
+            self.wss = websocket.WebSocketApp(
+                self.api.wss_url,
+                header=self.headers,
+                cookie=self.api.session_data.get("cookies"),
+                **{name: self.threadsafe(callback)
+                   for name, callback in callbacks.items()},
+            )
+        else:
+            self.wss = AsyncWebSocketApp(
+                self.api.wss_url,
+                header=self.headers,
+                cookie=self.api.session_data.get("cookies"),
+                compression=self.api.compression,
+                compression_options=self.api.compression_options,
+                **callbacks,
+            )
+
+    def threadsafe(self, callback):
+        """Wrap a callback of the threaded client to run it on the event loop,
+        so handlers never race with the coroutines reading the shared state.
+
+        :param callback:
+
+        """
+        loop = self.api.loop
+
+        def wrapper(*args):
+            """ """
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(callback, *args)
+
+        return wrapper
 
     def on_message(self, wss, message):
         """Method to process websocket messages.
 
+        Frames are decoded into Engine.IO / Socket.IO packets and events are
+        routed by name through :attr:`event_handlers`; payloads of events
+        without a dedicated handler are routed by their shape.
+
         :param wss:
         :param message:
 
         """
-        global_value.ssl_Mutual_exclusion = True
-        self.api.tick()
         try:
-            if "authorization/reject" in str(message):
-                logger.info("Token rejeitado, fazendo reconexão automática.")
-                global_value.check_rejected_connection = 1
-            elif "s_authorization" in str(message):
-                global_value.check_accepted_connection = 1
-                global_value.check_rejected_connection = 0
-            elif "instruments/list" in str(message):
-                global_value.started_listen_instruments = True
+            packet = self.decoder.decode(message)
+            if packet is not None:
+                self.on_packet(packet)
+        except Exception as e:
+            logger.error(f"Failed to process websocket message: {e}")
+
+    def on_packet(self, packet):
+        """
+
+        :param packet: The decoded :class:`Packet
+            <quotexapi.ws.codec.Packet>`.
+
+        """
+        logger.debug(packet)
+        if packet.eio_type != EIO_MESSAGE:
+            if packet.eio_type == EIO_PONG:
+                self.heartbeat.on_pong()
+                if self.heartbeat.rtt is not None:
+                    # Half the ping RTT stands for the delay of a sample.
+                    self.api.timesync.latency = self.heartbeat.rtt / 2
+            elif packet.eio_type == EIO_OPEN:
+                self.on_handshake(packet.data or {})
+            return
+        if packet.sio_type in EVENT_TYPES:
+            data = packet.data[0] if packet.data else None
+            if packet.sio_type == SIO_BINARY_EVENT:
+                self.api.wss_message = data
+            self.dispatch(packet.event, data)
+        elif packet.sio_type == SIO_DISCONNECT:
+            logger.info(
+                "Evento de desconexão disparado pela plataforma, fazendo reconexão automática."
+            )
+            global_value.check_websocket_if_connect = 0
+            self.api.connection_event.set()
+
+    def on_handshake(self, data):
+        """Store the negotiated session parameters and start the heartbeat.
+
+        :param dict data: The decoded Engine.IO open packet.
+
+        """
+        handshake = self.api.handshake
+        handshake.update(data)
+        logger.debug(
+            f"Engine.IO session {handshake.sid}: ping every "
+            f"{handshake.ping_interval}s, timeout {handshake.ping_timeout}s, "
+            f"max payload {handshake.max_payload}")
+        self.heartbeat.start(self.api.loop, handshake.ping_interval,
+                             handshake.ping_timeout)
+
+    def on_heartbeat_timeout(self):
+        """Close a connection whose pongs stopped arriving."""
+        global_value.websocket_error_reason = "Websocket heartbeat timed out."
+        global_value.check_websocket_if_connect = 0
+        self.api.connection_event.set()
+        self.wss.close()
+
+    def dispatch(self, event_name, data):
+        """Route a decoded event to its handler.
+
+        :param event_name: The socket.io event name, if known.
+        :param data: The event payload.
+
+        """
+        handler = self.event_handlers.get(event_name)
+        if handler is not None:
+            handler(data)
+        elif isinstance(data, dict):
+            self.on_payload(data)
+        elif isinstance(data, list) and data:
+            self.on_stream(data)
+
+    def on_payload(self, message):
+        """Route a dict payload by the first known key it carries.
+
+        :param message:
+
+        """
+        for key, handler in self.payload_handlers:
+            if message.get(key):
+                handler(message)
+                return
+
+    def on_stream(self, message):
+        """Handle realtime price and sentiment rows.
+
+        :param message:
+
+        """
+        if len(message[0]) == 4:
+            asset, tick_time, price = message[0][:3]
+            self.api.timesync.observe(tick_time)
+            prices = self.api.realtime_price.get(asset)
+            if prices is None:
+                prices = self.api.realtime_price[asset] = PriceBuffer(
+                    self.api.realtime_price_capacity)
+            prices.push(tick_time, price)
+            if self.api.candle_periods:
+                aggregator = self.api.candle_aggregators.get(asset)
+                if aggregator is None:
+                    aggregator = self.api.candle_aggregators[asset] = (
+                        OhlcAggregator(self.api.candle_periods))
+                aggregator.update(tick_time, price)
+        elif len(message[0]) == 2:
+            for i in message:
+                result = {
+                    "sentiment": {
+                        "sell": 100 - int(i[1]),
+                        "buy": int(i[1])
+                    }
+                }
+                self.api.realtime_sentiment[i[0]] = result
+
+    def on_authorization(self, message):
+        """
+
+        :param message:
+
+        """
+        global_value.check_accepted_connection = 1
+        global_value.check_rejected_connection = 0
+        self.api.pending.resolve("authorization", result=(True, message))
+
+    def on_authorization_reject(self, message):
+        """
+
+        :param message:
+
+        """
+        logger.info("Token rejeitado, fazendo reconexão automática.")
+        global_value.check_rejected_connection = 1
+        self.api.pending.resolve("authorization", result=(False, message))
+        self.api.connection_event.set()
+
+    def on_instruments(self, message):
+        """
+
+        :param message:
+
+        """
+        global_value.started_listen_instruments = True
+        self.api.instruments = message
+
+    def on_settings_list(self, message):
+        """
+
+        :param message:
+
+        """
+        self.api.settings_list = message
+
+    def on_history_list(self, message):
+        """
+
+        :param message:
+
+        """
+        asset = message.get("asset")
+        try:
+            message["candles"] = CandleArray.from_rows(message["candles"])
+        except (KeyError, TypeError, ValueError) as e:
+            self.api.pending.fail("history/list/v2", asset, e)
+            raise
+        self.api.candle_v2_data[asset] = message
+        self.api.pending.resolve("history/list/v2", asset, message)
+
+    def on_signals(self, message):
+        """
+
+        :param message:
+
+        """
+        time_in = message.get("time")
+        for i in message["signals"]:
             try:
-                _message: str = message[1:].decode()
-                logger.debug(_message)
-                message = json.loads(_message)
-                self.api.wss_message = message
-                if "call" in str(message) or "put" in str(message):
-                    self.api.instruments = message
-                if message.get("signals"):
-                    time_in = message.get("time")
-                    for i in message["signals"]:
-                        try:
-                            self.api.signal_data[i[0]] = {}
-                            self.api.signal_data[i[0]][i[2]] = {}
-                            self.api.signal_data[i[0]][
-                                i[2]]["dir"] = i[1][0]["signal"]
-                            self.api.signal_data[i[0]][
-                                i[2]]["duration"] = i[1][0]["timeFrame"]
-                        except:
-                            self.api.signal_data[i[0]] = {}
-                            self.api.signal_data[i[0]][time_in] = {}
-                            self.api.signal_data[
-                                i[0]][time_in]["dir"] = i[1][0][1]
-                            self.api.signal_data[
-                                i[0]][time_in]["duration"] = i[1][0][0]
-                elif message.get("liveBalance") or message.get("demoBalance"):
-                    self.api.account_balance = message
-                elif message.get("index"):
-                    self.api.candles.candles_data = message
-                elif message.get("purchaseTime"):
-                    request_id = message.get("requestId")
-                    self.api.orders[request_id]["id"] = message.get("id")
-                    self.api.orders[request_id]["response"] = message
-
-                    self.api.buy_successful = message
-                    self.api.buy_id = message["id"]
-                    self.api.timesync.server_timestamp = message[
-                        "closeTimestamp"]
-                elif message.get("ticket"):
-                    self.api.sold_options_respond = message
-                elif message.get("deals"):
-                    for deal in message["deals"]:
-                        request_id = self.api.get_request_id_from_order_id(
-                            deal["id"])
-                        if request_id:
-                            self.api.orders[request_id]["result"] = deal
-                            self.api.orders[request_id]["status"] = (
-                                DEAL_STATUS_WIN
-                                if deal["profit"] > 0 else DEAL_STATUS_LOSS)
-
-                        self.api.profit_in_operation = deal["profit"]
-                        deal["win"] = True if message["profit"] > 0 else False
-                        deal["game_state"] = 1
-                        self.api.listinfodata.set(deal["win"],
-                                                  deal["game_state"],
-                                                  deal["id"])
-                elif message.get("isDemo") and message.get("balance"):
-                    self.api.training_balance_edit_request = message
-                elif message.get("error"):
-                    global_value.websocket_error_reason = message.get("error")
-                    global_value.check_websocket_if_error = True
-                    if global_value.websocket_error_reason == "not_money":
-                        self.api.account_balance = {"liveBalance": 0}
-                elif not message.get("list") == []:
-                    self.api.wss_message = message
+                self.api.signal_data[i[0]] = {}
+                self.api.signal_data[i[0]][i[2]] = {}
+                self.api.signal_data[i[0]][i[2]]["dir"] = i[1][0]["signal"]
+                self.api.signal_data[i[0]][
+                    i[2]]["duration"] = i[1][0]["timeFrame"]
             except:
-                pass
-            if str(message) == "41":
-                logger.info(
-                    "Evento de desconexão disparado pela plataforma, fazendo reconexão automática."
-                )
-                global_value.check_websocket_if_connect = 0
-            if "51-" in str(message):
-                self.api._temp_status = str(message)
-            elif (self.api._temp_status ==
-                  """451-["settings/list",{"_placeholder":true,"num":0}]"""):
-                self.api.settings_list = message
-                self.api._temp_status = ""
-            elif (self.api._temp_status ==
-                  """451-["history/list/v2",{"_placeholder":true,"num":0}]"""):
-                if message.get("asset") == self.api.current_asset:
-                    # self.api.candles.candles_data = message["history"]
-                    self.api.candle_v2_data[message["asset"]] = message
-                    self.api.candle_v2_data[message["asset"]]["candles"] = [{
-                        "time":
-                            candle[0],
-                        "open":
-                            candle[1],
-                        "close":
-                            candle[2],
-                        "high":
-                            candle[3],
-                        "low":
-                            candle[4],
-                        "ticks":
-                            candle[5],
-                    } for candle in message["candles"]]
-            elif len(message[0]) == 4:
-                result = {"time": message[0][1], "price": message[0][2]}
-                self.api.realtime_price[message[0][0]].append(result)
-            elif len(message[0]) == 2:
-                for i in message:
-                    result = {
-                        "sentiment": {
-                            "sell": 100 - int(i[1]),
-                            "buy": int(i[1])
-                        }
-                    }
-                    self.api.realtime_sentiment[i[0]] = result
-        except:
-            pass
-        global_value.ssl_Mutual_exclusion = False
+                self.api.signal_data[i[0]] = {}
+                self.api.signal_data[i[0]][time_in] = {}
+                self.api.signal_data[i[0]][time_in]["dir"] = i[1][0][1]
+                self.api.signal_data[i[0]][time_in]["duration"] = i[1][0][0]
+
+    def on_balance(self, message):
+        """
+
+        :param message:
+
+        """
+        self.api.account_balance = message
+        for queue in self.api.balance_watchers:
+            # Watchers only care about the latest balance, drop a stale one.
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def on_candles(self, message):
+        """
+
+        :param message:
+
+        """
+        if message.get("data"):
+            try:
+                message["data"] = CandleArray.from_rows(message["data"])
+            except (KeyError, TypeError, ValueError) as e:
+                self.api.pending.fail("history/load", message.get("index"), e)
+                raise
+        self.api.candles.candles_data = message
+        self.api.pending.resolve("history/load", message.get("index"), message)
+
+    def on_order_opened(self, message):
+        """
+
+        :param message:
+
+        """
+        request_id = message.get("requestId")
+        self.api.orders[request_id]["id"] = message.get("id")
+        self.api.order_ids[message.get("id")] = request_id
+        self.api.orders[request_id]["response"] = message
+
+        self.api.buy_successful = message
+        self.api.buy_id = message["id"]
+        self.api.timesync.server_timestamp = message["closeTimestamp"]
+        if message.get("openTimestamp"):
+            self.api.timesync.observe(message["openTimestamp"], precise=False)
+        self.api.pending.resolve("orders/open", request_id, message)
+
+    def on_option_sold(self, message):
+        """
+
+        :param message:
+
+        """
+        self.api.sold_options_respond = message
+        self.api.pending.resolve("orders/cancel", message.get("ticket"), message)
+
+    def on_deals(self, message):
+        """
+
+        :param message:
+
+        """
+        for deal in message["deals"]:
+            request_id = self.api.get_request_id_from_order_id(deal["id"])
+            if request_id:
+                self.api.orders[request_id]["result"] = deal
+                self.api.orders[request_id]["status"] = (
+                    DEAL_STATUS_WIN if deal["profit"] > 0 else DEAL_STATUS_LOSS)
+
+            self.api.profit_in_operation = deal["profit"]
+            deal["win"] = deal["profit"] > 0
+            deal["game_state"] = 1
+            self.api.listinfodata.set(deal["win"], deal["game_state"],
+                                      deal["id"])
+            self.api.pending.resolve("deals", deal["id"], deal)
+
+    def on_demo_refill(self, message):
+        """
+
+        :param message:
+
+        """
+        if message.get("balance"):
+            self.api.training_balance_edit_request = message
+            self.api.pending.resolve("demo/refill", result=message)
+
+    def on_error_message(self, message):
+        """
+
+        :param message:
+
+        """
+        global_value.websocket_error_reason = message.get("error")
+        global_value.check_websocket_if_error = True
+        if global_value.websocket_error_reason == "not_money":
+            self.api.account_balance = {"liveBalance": 0}
+        # Errors carry no requestId, so they fail every order still waiting.
+        self.api.pending.fail_all(
+            "orders/open", RuntimeError(global_value.websocket_error_reason))
 
     def on_error(self, wss, error):
         """Method to process websocket errors.
@@ -194,6 +431,7 @@ class WebsocketClient(object):
         logger.error(error)
         global_value.websocket_error_reason = str(error)
         global_value.check_websocket_if_error = True
+        self.api.connection_event.set()
 
     def on_open(self, wss):
         """Method to process websocket open. It is necessary to perform exact warm-up requests,
@@ -204,12 +442,8 @@ class WebsocketClient(object):
         """
         logger.info("Websocket client connected.")
         global_value.check_websocket_if_connect = 1
+        self.api.connection_event.set()
         self.warm_up()
-        asyncio.get_event_loop().create_task(self.start_pinging())
-
-    async def start_pinging(self):
-        while True: await asyncio.sleep(1); print('Pinging...'); self.wss.send("2")
-        
 
     def on_close(self, wss, close_status_code, close_msg):
         """Method to process websocket close.
@@ -220,7 +454,11 @@ class WebsocketClient(object):
 
         """
         logger.info("Websocket connection closed.")
+        self.heartbeat.stop()
+        self.api.pending.fail_everything(
+            ConnectionError("Websocket connection closed."))
         global_value.check_websocket_if_connect = 0
+        self.api.connection_event.set()
 
     def on_ping(self, wss, ping_msg):
         """
@@ -238,13 +476,13 @@ class WebsocketClient(object):
         :param pong_msg:
 
         """
-        self.wss.send("2")
+        pass
 
     def warm_up(self):
         """ """
         asset_name = self.api.current_asset
         period = self.api.current_period
-        self.api.tick()
+        self.api.tick(force=True)
         self.api.send_wss_payload("balance/list")
         self.api.send_wss_payload("indicator/list")
         self.api.send_wss_payload("drawing/load")
@@ -254,5 +492,5 @@ class WebsocketClient(object):
         self.api.get_chart_notifications(asset_name)
         self.api.follow_candle(asset_name)
         self.api.switch_to_asset(asset_name, period)
-        self.api.tick()
+        self.api.tick(force=True)
         pass
@@ -0,0 +1,232 @@
+"""Module for Quotex Engine.IO / Socket.IO frame codec."""
+import json
+import logging
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Engine.IO packet types.
+EIO_OPEN = 0
+EIO_CLOSE = 1
+EIO_PING = 2
+EIO_PONG = 3
+EIO_MESSAGE = 4
+EIO_UPGRADE = 5
+EIO_NOOP = 6
+
+# Socket.IO packet types.
+SIO_CONNECT = 0
+SIO_DISCONNECT = 1
+SIO_EVENT = 2
+SIO_ACK = 3
+SIO_ERROR = 4
+SIO_BINARY_EVENT = 5
+SIO_BINARY_ACK = 6
+
+DEFAULT_NAMESPACE = "/"
+BINARY_TYPES = (SIO_BINARY_EVENT, SIO_BINARY_ACK)
+EVENT_TYPES = (SIO_EVENT, SIO_BINARY_EVENT)
+
+# Every binary event sent by Quotex carries a single attachment as its only
+# argument, those headers are decoded without going through JSON.
+SINGLE_ATTACHMENT_PREFIX = '451-["'
+SINGLE_ATTACHMENT_SUFFIX = '",{"_placeholder":true,"num":0}]'
+SINGLE_ATTACHMENT_EVENT = slice(len(SINGLE_ATTACHMENT_PREFIX),
+                                -len(SINGLE_ATTACHMENT_SUFFIX))
+SINGLE_ATTACHMENT = [{"_placeholder": True, "num": 0}]
+
+
+class Packet(NamedTuple):
+    """Decoded Engine.IO packet, with its Socket.IO fields for messages."""
+
+    eio_type: int
+    sio_type: Optional[int] = None
+    namespace: str = DEFAULT_NAMESPACE
+    id: Optional[int] = None
+    event: Optional[str] = None
+    data: Any = None
+    attachments: int = 0
+
+
+def _reconstruct(data, buffers):
+    """Replace `{"_placeholder": true, "num": n}` markers with attachments.
+
+    :param data: The decoded packet data.
+    :param buffers: The received attachments, in order.
+
+    """
+    if isinstance(data, list):
+        return [_reconstruct(item, buffers) for item in data]
+    if isinstance(data, dict):
+        if data.get("_placeholder") is True:
+            return buffers[data["num"]]
+        return {key: _reconstruct(value, buffers) for key, value in data.items()}
+    return data
+
+
+class Decoder(object):
+    """Stateful decoder turning websocket frames into :class:`Packet`.
+
+    Binary events are announced by a text frame such as
+    `451-["history/list/v2",{"_placeholder":true,"num":0}]` and completed by
+    one binary frame per attachment. Other text frames arriving in between do
+    not disturb the pending event.
+    """
+
+    def __init__(self, loads=json.loads, binary_loads=None):
+        """
+        :param loads: Callable decoding the JSON part of text frames.
+        :param binary_loads: Callable decoding binary attachments, Quotex
+            sends JSON in them. Attachments are kept as `bytes` when None.
+        """
+        self.loads = loads
+        self.binary_loads = binary_loads
+        self.pending: Optional[Packet] = None
+        self.buffers = []
+
+    def decode(self, frame):
+        """Decode one websocket frame.
+
+        :param frame: `str` for text frames, `bytes` for binary frames.
+        :returns: The :class:`Packet`, or None while attachments are missing.
+        """
+        if isinstance(frame, str):
+            return self.decode_text(frame)
+        return self.decode_binary(frame)
+
+    def decode_text(self, frame):
+        """
+
+        :param frame:
+
+        """
+        if (frame.startswith(SINGLE_ATTACHMENT_PREFIX)
+                and frame.endswith(SINGLE_ATTACHMENT_SUFFIX)):
+            event = frame[SINGLE_ATTACHMENT_EVENT]
+            if '"' not in event:
+                self._set_pending(
+                    Packet(EIO_MESSAGE, SIO_BINARY_EVENT, DEFAULT_NAMESPACE,
+                           None, event, SINGLE_ATTACHMENT, 1))
+                return None
+
+        eio_type = ord(frame[0]) - 48
+        if eio_type != EIO_MESSAGE:
+            data = frame[1:] or None
+            if eio_type == EIO_OPEN and data:
+                data = self.loads(data)
+            return Packet(eio_type, data=data)
+
+        size = len(frame)
+        if size == 1:
+            return Packet(eio_type)
+        sio_type = ord(frame[1]) - 48
+        index = 2
+        attachments = 0
+        if sio_type in BINARY_TYPES:
+            dash = frame.index("-", index)
+            attachments = int(frame[index:dash])
+            index = dash + 1
+        namespace = DEFAULT_NAMESPACE
+        if index < size and frame[index] == "/":
+            comma = frame.find(",", index)
+            if comma < 0:
+                comma = size
+            namespace = frame[index:comma]
+            index = comma + 1
+        start = index
+        while index < size and frame[index].isdigit():
+            index += 1
+        ack_id = int(frame[start:index]) if index > start else None
+        data = self.loads(frame[index:]) if index < size else None
+        event = None
+        if sio_type in EVENT_TYPES and data:
+            event, data = data[0], data[1:]
+
+        packet = Packet(eio_type, sio_type, namespace, ack_id, event, data,
+                        attachments)
+        if attachments:
+            self._set_pending(packet)
+            return None
+        return packet
+
+    def _set_pending(self, packet):
+        """
+
+        :param packet:
+
+        """
+        if self.pending is not None:
+            logger.warning(
+                f"Dropping incomplete binary event {self.pending.event}")
+        self.pending = packet
+        self.buffers = []
+
+    def decode_binary(self, frame):
+        """
+
+        :param frame:
+
+        """
+        # Engine.IO v3 prefixes binary websocket frames with the message type.
+        if frame[:1] == b"\x04":
+            frame = frame[1:]
+        buffer = self.binary_loads(frame) if self.binary_loads else bytes(frame)
+        pending = self.pending
+        if pending is None:
+            return Packet(EIO_MESSAGE, SIO_BINARY_EVENT, data=[buffer])
+        if pending.data is SINGLE_ATTACHMENT:
+            data = [buffer]
+        else:
+            self.buffers.append(buffer)
+            if len(self.buffers) < pending.attachments:
+                return None
+            data = _reconstruct(pending.data, self.buffers)
+            self.buffers = []
+        self.pending = None
+        return Packet(pending.eio_type, pending.sio_type, pending.namespace,
+                      pending.id, pending.event, data, pending.attachments)
+
+
+def encode_packet(sio_type,
+                  data=None,
+                  namespace=DEFAULT_NAMESPACE,
+                  ack_id=None,
+                  dumps=json.dumps):
+    """Encode a Socket.IO packet as an Engine.IO message text frame.
+
+    :param int sio_type: The Socket.IO packet type.
+    :param data:  (Default value = None)
+    :param str namespace:  (Default value = "/")
+    :param int ack_id:  (Default value = None)
+    :param dumps: Callable encoding `data` to JSON text.
+
+    """
+    frame = f"4{sio_type}"
+    if namespace != DEFAULT_NAMESPACE:
+        frame += f"{namespace},"
+    if ack_id is not None:
+        frame += str(ack_id)
+    if data is not None:
+        frame += dumps(data)
+    return frame
+
+
+def encode_event(event, *args, namespace=DEFAULT_NAMESPACE, ack_id=None,
+                 dumps=json.dumps):
+    """Encode an event, ex. `42["tick"]` or `42["depth/follow","EURUSD"]`.
+
+    :param str event: The event name.
+    :param args: The event arguments.
+    :param str namespace:  (Default value = "/")
+    :param int ack_id:  (Default value = None)
+    :param dumps: Callable encoding the arguments to JSON text.
+
+    """
+    if namespace == DEFAULT_NAMESPACE and ack_id is None:
+        if not args:
+            return f'42["{event}"]'
+        if len(args) == 1:
+            return f'42["{event}",{dumps(args[0])}]'
+    return encode_packet(SIO_EVENT, [event, *args], namespace, ack_id, dumps)
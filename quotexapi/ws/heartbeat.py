@@ -0,0 +1,140 @@
+"""Module for Quotex websocket heartbeat scheduler."""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Engine.IO v3 defaults, used until the open packet says otherwise.
+DEFAULT_PING_INTERVAL = 25.0
+DEFAULT_PING_TIMEOUT = 20.0
+
+
+class Heartbeat(object):
+    """Timer driven Engine.IO heartbeat.
+
+    Engine.IO v3 clients send a `2` ping every `pingInterval` and the server
+    answers with a `3` pong; a pong missing after `pingTimeout` means the
+    connection is dead. The app-level `tick` is scheduled on its own slower
+    timer, so neither depends on inbound traffic.
+    """
+
+    def __init__(self, ping, tick=None, tick_interval=10.0, on_timeout=None):
+        """
+        :param ping: Callable sending the Engine.IO ping frame.
+        :param tick: Callable sending the app-level tick.  (Default value = None)
+        :param float tick_interval: Seconds between ticks.
+        :param on_timeout: Callable run when a pong does not arrive in time.
+        """
+        self.ping = ping
+        self.tick = tick
+        self.on_timeout = on_timeout
+        self.tick_interval = tick_interval
+        self.ping_interval = DEFAULT_PING_INTERVAL
+        self.ping_timeout = DEFAULT_PING_TIMEOUT
+        self.loop = None
+        self._ping_handle = None
+        self._tick_handle = None
+        self._pong_handle = None
+        self._next_tick = None
+        self.last_ping = None
+        self.last_pong = None
+        self.pings_sent = 0
+        self.pongs_received = 0
+        self.timeouts = 0
+        self.rtt = None
+
+    @property
+    def running(self):
+        """Property to check if the heartbeat is scheduled."""
+        return self._ping_handle is not None
+
+    def start(self, loop, ping_interval=None, ping_timeout=None):
+        """Start the timers, replacing any previous schedule.
+
+        :param loop: The event loop running the websocket.
+        :param float ping_interval: Seconds between pings.
+        :param float ping_timeout: Seconds to wait for a pong.
+
+        """
+        self.stop()
+        self.loop = loop
+        if ping_interval:
+            self.ping_interval = ping_interval
+        if ping_timeout:
+            self.ping_timeout = ping_timeout
+        self.last_ping = None
+        self.last_pong = None
+        self._ping_handle = loop.call_later(self.ping_interval, self._send_ping)
+        if self.tick is not None:
+            self._next_tick = loop.time() + self.tick_interval
+            self._tick_handle = loop.call_at(self._next_tick, self._send_tick)
+
+    def stop(self):
+        """Cancel the timers."""
+        for handle in (self._ping_handle, self._tick_handle, self._pong_handle):
+            if handle is not None:
+                handle.cancel()
+        self._ping_handle = None
+        self._tick_handle = None
+        self._pong_handle = None
+
+    def _send_ping(self):
+        """ """
+        self._ping_handle = self.loop.call_later(self.ping_interval,
+                                                 self._send_ping)
+        self.last_ping = time.monotonic()
+        self.pings_sent += 1
+        if self._pong_handle is None:
+            self._pong_handle = self.loop.call_later(self.ping_timeout,
+                                                     self._pong_timeout)
+        try:
+            self.ping()
+        except Exception as e:
+            logger.error(f"Failed to send heartbeat: {e}")
+
+    def _pong_timeout(self):
+        """ """
+        self._pong_handle = None
+        self.timeouts += 1
+        logger.warning(
+            f"No pong received within {self.ping_timeout}s, connection is dead.")
+        self.stop()
+        if self.on_timeout is not None:
+            self.on_timeout()
+
+    def _send_tick(self):
+        """ """
+        # Scheduled from the previous deadline, not from now, so the
+        # callbacks running late does not add up into skipped ticks.
+        self._next_tick = max(self._next_tick + self.tick_interval,
+                              self.loop.time())
+        self._tick_handle = self.loop.call_at(self._next_tick,
+                                              self._send_tick)
+        try:
+            self.tick()
+        except Exception as e:
+            logger.error(f"Failed to send tick: {e}")
+
+    def on_pong(self):
+        """Record a pong from the server."""
+        self.last_pong = time.monotonic()
+        self.pongs_received += 1
+        if self._pong_handle is not None:
+            self._pong_handle.cancel()
+            self._pong_handle = None
+        if self.last_ping is not None:
+            self.rtt = self.last_pong - self.last_ping
+
+    def stats(self):
+        """Get the heartbeat counters.
+
+        :returns: A dict with the intervals, ping/pong counters and last RTT.
+        """
+        return {
+            "ping_interval": self.ping_interval,
+            "ping_timeout": self.ping_timeout,
+            "pings_sent": self.pings_sent,
+            "pongs_received": self.pongs_received,
+            "timeouts": self.timeouts,
+            "rtt": self.rtt,
+        }
@@ -1,12 +1,136 @@
+import numpy as np
+
 from quotexapi.ws.objects.base import Base
 
+# Same column order as the `history/list/v2` candles.
+CANDLE_DTYPE = np.dtype([
+    ("time", np.float64),
+    ("open", np.float64),
+    ("close", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("ticks", np.int64),
+])
+CANDLE_FIELDS = CANDLE_DTYPE.names
+
+
+class CandleArray(object):
+    """Columnar candles backed by a :data:`CANDLE_DTYPE` structured array.
+
+    Columns are read as arrays, ex. `candles["close"]` or `candles.close`,
+    while integer indexes and iteration give the candle dicts the list used to
+    hold, so existing callers keep working.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data=None):
+        """
+        :param data: A :data:`CANDLE_DTYPE` array.  (Default value = None)
+        """
+        self.data = (np.zeros(0, dtype=CANDLE_DTYPE)
+                     if data is None else data)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from `[time, open, close, high, low, ticks]` rows or dicts.
+
+        A missing or None `ticks` is 0, a None price is NaN.
+
+        :param rows: The candles of a history response.
+        :raises ValueError: If a row has no time or less than 5 values.
+
+        """
+        if not rows:
+            return cls()
+        if isinstance(rows[0], dict):
+            rows = [(row["time"], row["open"], row["close"], row["high"],
+                     row["low"], row.get("ticks")) for row in rows]
+        columns = np.array(rows, dtype=np.float64)
+        if columns.ndim != 2 or columns.shape[1] < 5:
+            raise ValueError(f"Candle rows need at least 5 values, "
+                             f"got an array of shape {columns.shape}.")
+        if np.isnan(columns[:, 0]).any():
+            raise ValueError("Candle rows need a time.")
+        data = np.zeros(len(columns), dtype=CANDLE_DTYPE)
+        for name, column in zip(CANDLE_FIELDS, columns.T):
+            if name == "ticks":
+                column = np.nan_to_num(column, nan=0.0)
+            data[name] = column
+        return cls(data)
+
+    @classmethod
+    def merge(cls, parts):
+        """Join candle arrays into one sorted by time, without duplicates.
+
+        Where parts overlap, the candle of the first part holding its time is
+        kept.
+
+        :param parts: The :class:`CandleArray` or candle rows to join.
+
+        """
+        arrays = [part.data if isinstance(part, CandleArray) else
+                  cls.from_rows(part).data for part in parts]
+        arrays = [array for array in arrays if len(array)]
+        if not arrays:
+            return cls()
+        data = np.concatenate(arrays)
+        _, first = np.unique(data["time"], return_index=True)
+        return cls(data[first])
+
+    def between(self, start, end):
+        """Get the candles opened in `[start, end)`.
+
+        :param float start:
+        :param float end:
+
+        """
+        times = self.data["time"]
+        return CandleArray(self.data[(times >= start) & (times < end)])
+
+    def __getattr__(self, name):
+        if name in CANDLE_FIELDS:
+            return self.data[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            return self.data[index]
+        if isinstance(index, slice):
+            return CandleArray(self.data[index])
+        return self._candle(self.data[index])
+
+    def __iter__(self):
+        for row in self.data:
+            yield self._candle(row)
+
+    def __repr__(self):
+        return repr(self.to_dicts())
+
+    @staticmethod
+    def _candle(row):
+        """
+
+        :param row:
+
+        """
+        return dict(zip(CANDLE_FIELDS, row.tolist()))
+
+    def to_dicts(self):
+        """Get the candles as a list of dicts."""
+        return [dict(zip(CANDLE_FIELDS, row)) for row in self.data.tolist()]
+
 
 class Candle(object):
     """Class for Quotex candle."""
 
     def __init__(self, candle_data):
         """
-        :param candle_data: The list of candles data.
+        :param candle_data: The list of candles data, or a row of
+            :class:`CandleArray` data.
         """
         self.__candle_data = candle_data
 
@@ -0,0 +1,87 @@
+import time
+from quotexapi.ws.objects.base import Base
+
+
+class Handshake(Base):
+    """Class for Quotex Engine.IO handshake websocket object."""
+
+    def __init__(self):
+        super(Handshake, self).__init__()
+        self.__name = "handshake"
+        self.__sid = None
+        self.__upgrades = []
+        self.__ping_interval = None
+        self.__ping_timeout = None
+        self.__max_payload = None
+        self.__received_at = None
+
+    def update(self, data):
+        """Method to set the session parameters of an open packet.
+
+        :param dict data: The decoded `0{...}` open packet.
+        """
+        ping_interval = data.get("pingInterval")
+        ping_timeout = data.get("pingTimeout")
+        self.__sid = data.get("sid")
+        self.__upgrades = data.get("upgrades") or []
+        self.__ping_interval = ping_interval / 1000 if ping_interval else None
+        self.__ping_timeout = ping_timeout / 1000 if ping_timeout else None
+        self.__max_payload = data.get("maxPayload")
+        self.__received_at = time.time()
+
+    def reset(self):
+        """Method to forget the parameters of a previous session."""
+        self.__init__()
+
+    @property
+    def sid(self):
+        """Property to get the Engine.IO session id.
+
+        :returns: The session id.
+        """
+        return self.__sid
+
+    @property
+    def upgrades(self):
+        """Property to get the transport upgrades offered by the server.
+
+        :returns: The list of transport names.
+        """
+        return self.__upgrades
+
+    @property
+    def ping_interval(self):
+        """Property to get the heartbeat interval.
+
+        :returns: The ping interval in seconds.
+        """
+        return self.__ping_interval
+
+    @property
+    def ping_timeout(self):
+        """Property to get the heartbeat timeout.
+
+        :returns: The ping timeout in seconds.
+        """
+        return self.__ping_timeout
+
+    @property
+    def max_payload(self):
+        """Property to get the maximum payload size accepted by the server.
+
+        :returns: The size in bytes, or None if not announced.
+        """
+        return self.__max_payload
+
+    @property
+    def received_at(self):
+        """Property to get when the handshake was received.
+
+        :returns: The timestamp of the open packet.
+        """
+        return self.__received_at
+
+    @property
+    def completed(self):
+        """Property to check if the open packet was received."""
+        return self.__received_at is not None
@@ -1,16 +1,63 @@
 import time
 import datetime
+from collections import deque
+
 from quotexapi.ws.objects.base import Base
 
 
 class TimeSync(Base):
-    """Class for Quotex TimeSync websocket object."""
+    """Class for Quotex TimeSync websocket object.
+
+    The server clock offset is estimated from server timestamps observed on
+    arrival, ex. the millisecond times of realtime quotes. Such a sample is
+    the offset minus the transit delay of its message, so the largest sample
+    of the last :attr:`window` seconds is the tightest estimate, and half the
+    heartbeat RTT is added for the delay left in it.
+    """
+
+    window = 60.0
 
     def __init__(self):
         super(TimeSync, self).__init__()
         self.__name = "timeSync"
         self.__server_timestamp = time.time()
         self.__expiration_time = 1
+        self.__offset = 0.0
+        # (received at, sample) with decreasing samples, the max first.
+        self.__samples = deque()
+        self.__synced_at = None
+        self.latency = 0.0
+
+    def observe(self, server_time, received_at=None, precise=True):
+        """Add an offset sample from a server timestamp just received.
+
+        :param float server_time: The server timestamp.
+        :param float received_at: The local time it arrived at, now if None.
+        :param bool precise: False for whole-second timestamps, which help
+            the estimate but do not make the clock :attr:`synced`.
+
+        """
+        if received_at is None:
+            received_at = time.time()
+        sample = server_time - received_at
+        samples = self.__samples
+        while samples and samples[-1][1] <= sample:
+            samples.pop()
+        samples.append((received_at, sample))
+        while samples[0][0] < received_at - self.window:
+            samples.popleft()
+        if precise:
+            self.__synced_at = received_at
+
+    @property
+    def synced(self):
+        """Property to check if a sub-second sample arrived in :attr:`window`.
+
+        :returns: True when :attr:`server_now` is accurate to the transit
+            delay, else it may be off by up to a second or more.
+        """
+        return (self.__synced_at is not None
+                and time.time() - self.__synced_at < self.window)
 
     @property
     def server_timestamp(self):
@@ -28,6 +75,30 @@ class TimeSync(Base):
         """Method to set server timestamp."""
         self.__server_timestamp = timestamp
 
+    @property
+    def offset(self):
+        """Property to get the server clock offset.
+
+        :returns: The seconds to add to the local clock to get server time,
+            the one set by hand before the first sample.
+        """
+        if self.__samples:
+            return self.__samples[0][1] + self.latency
+        return self.__offset
+
+    @offset.setter
+    def offset(self, seconds):
+        """Method to set the server clock offset, used until a sample."""
+        self.__offset = seconds
+
+    @property
+    def server_now(self):
+        """Property to get the current server time.
+
+        :returns: The local timestamp corrected by the estimated offset.
+        """
+        return time.time() + self.offset
+
     @property
     def server_datetime(self):
         """Property to get server datetime.
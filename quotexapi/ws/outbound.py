@@ -0,0 +1,151 @@
+"""Module for Quotex websocket outbound queue."""
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundQueue(object):
+    """Single-writer pipeline for outbound websocket frames.
+
+    Callers enqueue frames without blocking and one writer task drains them in
+    order, so the socket is only ever written from the event loop. Frames
+    queued during the same loop iteration are handed to `write_many` together,
+    ex. the warm-up and asset switch bursts become a single socket write.
+    """
+
+    def __init__(self, write, write_many=None):
+        """
+        :param write: Callable that writes one frame to the websocket.
+        :param write_many: Callable that writes a list of frames at once, the
+            frames are written one by one when None.
+        """
+        self.write = write
+        self.write_many = write_many
+        self.loop = None
+        self.queue = None
+        self.task = None
+        self._loop_thread_id = None
+        self.frames_sent = 0
+        self.frames_failed = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.flushes = 0
+        self.max_batch = 0
+
+    @property
+    def depth(self):
+        """Property to get the number of frames waiting to be written."""
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def start(self):
+        """Start the writer task on the running event loop."""
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self.queue = asyncio.Queue()
+        self.task = self.loop.create_task(self._drain())
+
+    def stop(self):
+        """Write the frames still queued and stop the writer task."""
+        if self.task is None:
+            return
+        self.flush()
+        self.task.cancel()
+        self.task = None
+
+    def put(self, data):
+        """Enqueue a frame, from the event loop or from any other thread.
+
+        :param data: The websocket frame.
+
+        """
+        item = (data, time.perf_counter())
+        if threading.get_ident() == self._loop_thread_id:
+            self._put(item)
+        else:
+            self.loop.call_soon_threadsafe(self._put, item)
+
+    def _put(self, item):
+        """
+
+        :param item:
+
+        """
+        self.queue.put_nowait(item)
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def flush(self):
+        """Write every queued frame right away."""
+        if not self.queue.empty():
+            self._write_batch(self._take())
+
+    def _take(self, items=None):
+        """Take every frame currently queued.
+
+        :param items: Frames already taken from the queue.  (Default value = None)
+
+        """
+        items = items or []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    async def _drain(self):
+        """ """
+        while True:
+            item = await self.queue.get()
+            self._write_batch(self._take([item]))
+
+    def _write_batch(self, items):
+        """
+
+        :param items: The `(data, enqueued_at)` pairs to write.
+
+        """
+        now = time.perf_counter()
+        for _, enqueued_at in items:
+            wait = now - enqueued_at
+            self.total_wait += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+        self.flushes += 1
+        if len(items) > self.max_batch:
+            self.max_batch = len(items)
+        if self.write_many is not None and len(items) > 1:
+            try:
+                self.write_many([data for data, _ in items])
+                self.frames_sent += len(items)
+            except Exception as e:
+                self.frames_failed += len(items)
+                logger.error(f"Failed to send websocket frames: {e}")
+            return
+        for data, _ in items:
+            try:
+                self.write(data)
+                self.frames_sent += 1
+            except Exception as e:
+                self.frames_failed += 1
+                logger.error(f"Failed to send websocket frame: {e}")
+
+    def stats(self):
+        """Get the queue counters.
+
+        :returns: A dict with depth, frames and wait time counters.
+        """
+        frames = self.frames_sent + self.frames_failed
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "frames_sent": self.frames_sent,
+            "frames_failed": self.frames_failed,
+            "avg_wait": self.total_wait / frames if frames else 0.0,
+            "max_wait": self.max_wait,
+            "flushes": self.flushes,
+            "frames_per_flush": frames / self.flushes if self.flushes else 0.0,
+            "max_batch": self.max_batch,
+        }
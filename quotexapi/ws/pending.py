@@ -0,0 +1,214 @@
+"""Module for Quotex in-flight websocket requests."""
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PendingMetrics(object):
+    """Counters of one kind of pending request."""
+
+    __slots__ = ("started", "resolved", "failed", "timed_out", "cancelled",
+                 "total_latency", "max_latency")
+
+    def __init__(self):
+        self.started = 0
+        self.resolved = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latency):
+        """
+
+        :param latency: Seconds between the request and its response.
+
+        """
+        self.resolved += 1
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+
+class PendingRequests(object):
+    """Registry of requests waiting for their response.
+
+    Requests are keyed by a kind, ex. "order" or "ticket", and a correlation
+    id, or None for requests identified by their event name alone. Each one is
+    an :class:`asyncio.Future` resolved by the websocket handler of its
+    response, with an optional deadline after which it fails with
+    :class:`asyncio.TimeoutError`. Futures are shared: registering a key
+    already in flight returns the same future.
+    """
+
+    def __init__(self, loop=None):
+        """
+        :param loop: The event loop the futures belong to.
+        """
+        self.loop = loop
+        self.requests = {}
+        self.metrics = {}
+
+    def add(self, kind, key=None, timeout=None):
+        """Register a request, or get the one in flight for the same key.
+
+        :param str kind: The kind of request.
+        :param key: The correlation id.  (Default value = None)
+        :param float timeout: Seconds before the request fails.
+
+        """
+        future = self.requests.get((kind, key))
+        if future is not None:
+            return future
+        loop = self.loop or asyncio.get_running_loop()
+        future = loop.create_future()
+        self.requests[(kind, key)] = future
+        metrics = self.metrics.setdefault(kind, PendingMetrics())
+        metrics.started += 1
+        started = time.perf_counter()
+        handle = None
+        if timeout is not None:
+            handle = loop.call_later(timeout, self._expire, future)
+        future.add_done_callback(
+            lambda done: self._done(kind, key, done, started, handle))
+        return future
+
+    def get(self, kind, key=None):
+        """Get the future of a request in flight.
+
+        :param str kind: The kind of request.
+        :param key: The correlation id.  (Default value = None)
+
+        """
+        return self.requests.get((kind, key))
+
+    def resolve(self, kind, key=None, result=None):
+        """Complete a request with its response.
+
+        :param str kind: The kind of request.
+        :param key: The correlation id.  (Default value = None)
+        :param result: The response.
+        :returns: True if a request was waiting for it.
+
+        """
+        future = self.requests.get((kind, key))
+        if future is None or future.done():
+            return False
+        future.set_result(result)
+        return True
+
+    def fail(self, kind, key=None, exception=None):
+        """Fail a request.
+
+        :param str kind: The kind of request.
+        :param key: The correlation id.  (Default value = None)
+        :param exception: The exception raised to the waiters.
+
+        """
+        future = self.requests.get((kind, key))
+        if future is not None and not future.done():
+            future.set_exception(exception)
+
+    def fail_all(self, kind, exception):
+        """Fail every request of a kind.
+
+        :param str kind: The kind of request.
+        :param exception: The exception raised to the waiters.
+
+        """
+        for (request_kind, _), future in list(self.requests.items()):
+            if request_kind == kind and not future.done():
+                future.set_exception(exception)
+
+    def fail_everything(self, exception):
+        """Fail every request in flight, ex. when the connection is lost.
+
+        :param exception: The exception raised to the waiters.
+
+        """
+        for future in list(self.requests.values()):
+            if not future.done():
+                future.set_exception(exception)
+
+    def cancel(self, kind, key=None):
+        """Cancel a request, its waiters get :class:`asyncio.CancelledError`.
+
+        :param str kind: The kind of request.
+        :param key: The correlation id.  (Default value = None)
+
+        """
+        future = self.requests.get((kind, key))
+        if future is not None:
+            future.cancel()
+
+    def outstanding(self, kind=None):
+        """Get the number of requests in flight.
+
+        :param str kind: Count only this kind.  (Default value = None)
+
+        """
+        if kind is None:
+            return len(self.requests)
+        return sum(1 for request_kind, _ in self.requests if request_kind == kind)
+
+    @staticmethod
+    def _expire(future):
+        """
+
+        :param future:
+
+        """
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError())
+
+    def _done(self, kind, key, future, started, handle):
+        """
+
+        :param kind:
+        :param key:
+        :param future:
+        :param started:
+        :param handle:
+
+        """
+        if handle is not None:
+            handle.cancel()
+        if self.requests.get((kind, key)) is future:
+            del self.requests[(kind, key)]
+        metrics = self.metrics[kind]
+        if future.cancelled():
+            metrics.cancelled += 1
+        elif isinstance(future.exception(), asyncio.TimeoutError):
+            metrics.timed_out += 1
+            logger.debug(f"Request {kind} {key} timed out.")
+        elif future.exception() is not None:
+            metrics.failed += 1
+        else:
+            metrics.record(time.perf_counter() - started)
+
+    def stats(self):
+        """Get the counters of every kind of request.
+
+        :returns: A dict of kind to its outstanding count, outcomes and
+            response latency.
+        """
+        outstanding = {}
+        for kind, _ in self.requests:
+            outstanding[kind] = outstanding.get(kind, 0) + 1
+        return {
+            kind: {
+                "outstanding": outstanding.get(kind, 0),
+                "started": metrics.started,
+                "resolved": metrics.resolved,
+                "failed": metrics.failed,
+                "timed_out": metrics.timed_out,
+                "cancelled": metrics.cancelled,
+                "avg_latency": (metrics.total_latency / metrics.resolved
+                                if metrics.resolved else 0.0),
+                "max_latency": metrics.max_latency,
+            }
+            for kind, metrics in self.metrics.items()
+        }
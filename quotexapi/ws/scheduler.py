@@ -0,0 +1,119 @@
+"""Module for Quotex scheduled orders."""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class OrderScheduler(object):
+    """Fire orders at a server timestamp with millisecond precision.
+
+    The asset switch and the order frame are done ahead of time, the loop is
+    woken once with :meth:`QuotexAPI.sleep_until
+    <quotexapi.api.QuotexAPI.sleep_until>` shortly before the target and the
+    last milliseconds are spun, since loop timers may fire about a millisecond
+    late. The frame is then written straight to the socket.
+
+    Send errors are measured against :attr:`TimeSync.server_now
+    <quotexapi.ws.objects.timesync.TimeSync.server_now>`, the local clock
+    corrected by the estimated server offset, so they leave out the error of
+    that estimate. They are only recorded while the clock is
+    :attr:`synced <quotexapi.ws.objects.timesync.TimeSync.synced>`, before
+    that the offset may be a second or more off.
+    """
+
+    def __init__(self, api, warm_up=1.0, spin=0.002):
+        """
+        :param api: The instance of :class:`QuotexAPI
+            <quotexapi.api.QuotexAPI>`.
+        :param float warm_up: Seconds before the target to switch asset and
+            encode the order.
+        :param float spin: Seconds before the target to stop yielding to the
+            event loop.
+        """
+        self.api = api
+        self.warm_up = warm_up
+        self.spin = spin
+        self.orders = 0
+        self.unsynced = 0
+        self.total_error = 0.0
+        self.max_error = 0.0
+        self.last_error = None
+
+    async def submit(self,
+                     timestamp,
+                     amount,
+                     asset,
+                     direction,
+                     duration,
+                     request_id,
+                     tournament_id=0,
+                     timeout=None):
+        """Send an order at a server timestamp.
+
+        :param timestamp: The server time to send the order at.
+        :param amount:
+        :param asset:
+        :param direction:
+        :param duration:
+        :param request_id:
+        :param tournament_id:  (Default value = 0)
+        :param timeout: Seconds to wait for the acknowledgement.
+        :returns: The acknowledgement future and the send-time error in
+            seconds against the estimated server clock, positive when late,
+            None if the clock is not synced.
+        """
+        timesync = self.api.timesync
+        if not timesync.synced:
+            logger.warning(f"Server clock not synced, order {request_id} "
+                           f"may be sent up to a second off.")
+        await self.api.sleep_until(timestamp - self.warm_up)
+        self.api.simulate_asset_switch(asset, duration)
+        buy = self.api.buy
+        frame, payload = buy.prepare(amount, asset, direction, duration,
+                                     request_id, tournament_id, timestamp)
+        await self.api.sleep_until(timestamp - self.spin)
+        while timesync.server_now < timestamp:
+            time.sleep(0)
+        future = buy.send(frame, payload, timeout, no_force_send=False)
+        error = None
+        if timesync.synced:
+            error = timesync.server_now - timestamp
+            self._record(error)
+            logger.debug(f"Order {request_id} sent {error * 1000:.3f}ms "
+                         f"{'late' if error >= 0 else 'early'}.")
+        else:
+            self.unsynced += 1
+        self.api.orders[request_id]["send_error"] = error
+        return future, error
+
+    def _record(self, error):
+        """
+
+        :param error:
+
+        """
+        self.orders += 1
+        self.total_error += abs(error)
+        self.max_error = max(self.max_error, abs(error))
+        self.last_error = error
+
+    def stats(self):
+        """Get the send-time error of the scheduled orders.
+
+        :returns: A dict with the count of orders sent on a synced clock,
+            their absolute errors against the estimated server clock, the
+            count sent unsynced and the current offset estimate.
+        """
+        timesync = self.api.timesync
+        return {
+            "measured_against": "TimeSync.server_now",
+            "synced": timesync.synced,
+            "offset": timesync.offset,
+            "latency": timesync.latency,
+            "unsynced": self.unsynced,
+            "orders": self.orders,
+            "avg_error": self.total_error / self.orders if self.orders else 0.0,
+            "max_error": self.max_error,
+            "last_error": self.last_error,
+        }
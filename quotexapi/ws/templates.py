@@ -0,0 +1,97 @@
+"""Module for Quotex pre-encoded websocket frame templates."""
+import re
+
+VOLATILE_FIELD = re.compile(r'"@@(\w+)@@"')
+
+
+def volatile(name):
+    """Placeholder for a payload field patched in on every render.
+
+    :param str name: The keyword used to pass the value to
+        :meth:`FrameTemplates.render`.
+
+    """
+    return f"@@{name}@@"
+
+
+class FrameTemplate(object):
+    """Encoded frame split around its volatile fields."""
+
+    __slots__ = ("parts", "fields")
+
+    def __init__(self, frame):
+        """
+        :param str frame: The encoded frame with :func:`volatile` placeholders.
+        """
+        pieces = VOLATILE_FIELD.split(frame)
+        self.parts = pieces[0::2]
+        self.fields = pieces[1::2]
+
+    def render(self, dumps, values):
+        """
+
+        :param dumps: Callable encoding a volatile value to JSON text.
+        :param dict values: The volatile field values.
+
+        """
+        if not self.fields:
+            return self.parts[0]
+        frame = [self.parts[0]]
+        for field, part in zip(self.fields, self.parts[1:]):
+            frame.append(dumps(values[field]))
+            frame.append(part)
+        return "".join(frame)
+
+
+class FrameTemplates(object):
+    """Cache of encoded frames keyed by action and its stable arguments.
+
+    The payload is built and encoded once per key; later renders only encode
+    the volatile fields, ex. the expiration time of `settings/store`.
+    """
+
+    def __init__(self, encode, dumps):
+        """
+        :param encode: Callable encoding `(action, payload)` to a frame.
+        :param dumps: Callable encoding a volatile value to JSON text.
+        """
+        self.encode = encode
+        self.dumps = dumps
+        self.templates = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, action, key=None, build=None, **values):
+        """Get the frame for `action`, encoding it on first use.
+
+        :param str action: The websocket action, ex. "depth/follow".
+        :param key: Hashable stable arguments the payload depends on.
+        :param build: Callable returning the payload, with :func:`volatile`
+            placeholders for the fields passed in `values`.
+        :param values: The volatile field values.
+
+        """
+        template = self.templates.get((action, key))
+        if template is None:
+            self.misses += 1
+            payload = build() if build is not None else None
+            template = FrameTemplate(self.encode(action, payload))
+            self.templates[(action, key)] = template
+        else:
+            self.hits += 1
+        return template.render(self.dumps, values)
+
+    def clear(self):
+        """ """
+        self.templates.clear()
+
+    def stats(self):
+        """Get the cache counters.
+
+        :returns: A dict with the template count, hits and misses.
+        """
+        return {
+            "templates": len(self.templates),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,318 @@
+"""Module for Quotex asyncio websocket transport."""
+import asyncio
+import logging
+import ssl
+from typing import Optional
+from urllib.parse import urlsplit
+
+from wsproto import ConnectionState
+from wsproto import ConnectionType
+from wsproto import WSConnection
+from wsproto.events import AcceptConnection
+from wsproto.events import BytesMessage
+from wsproto.events import CloseConnection
+from wsproto.events import Ping
+from wsproto.events import Pong
+from wsproto.events import RejectConnection
+from wsproto.events import Request
+from wsproto.events import TextMessage
+from wsproto.extensions import PerMessageDeflate
+
+logger = logging.getLogger(__name__)
+
+# Headers generated by wsproto itself during the upgrade request.
+HANDSHAKE_HEADERS = {
+    "connection",
+    "upgrade",
+    "host",
+    "sec-websocket-extensions",
+    "sec-websocket-key",
+    "sec-websocket-protocol",
+    "sec-websocket-version",
+}
+
+
+class AsyncWebSocketApp(object):
+    """Websocket connection driven by the asyncio event loop.
+
+    Frames are read and written on the loop itself through `wsproto`, while the
+    callbacks keep the signature of :class:`websocket.WebSocketApp`, so
+    :class:`WebsocketClient <quotexapi.ws.client.WebsocketClient>` handlers work
+    with either transport.
+    """
+
+    read_size = 65536
+
+    def __init__(
+        self,
+        url,
+        header=None,
+        cookie=None,
+        on_open=None,
+        on_message=None,
+        on_error=None,
+        on_close=None,
+        on_ping=None,
+        on_pong=None,
+        compression=True,
+        compression_options=None,
+    ):
+        """
+        :param str url: The websocket url.
+        :param dict header: Extra headers sent with the upgrade request.
+        :param str cookie: The cookie header value.
+        :param bool compression: Offer `permessage-deflate` to the server.
+        :param dict compression_options: Keyword arguments of
+            :class:`wsproto.extensions.PerMessageDeflate`, ex.
+            `client_max_window_bits` or `server_no_context_takeover`.
+        """
+        self.url = url
+        self.header = header or {}
+        self.cookie = cookie
+        self.on_open = on_open
+        self.on_message = on_message
+        self.on_error = on_error
+        self.on_close = on_close
+        self.on_ping = on_ping
+        self.on_pong = on_pong
+        self.connection: Optional[WSConnection] = None
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.keep_running = False
+        self.compression = compression
+        self.compression_options = compression_options or {}
+        self.extensions = []
+        self._fragments = []
+        self.wire_bytes_received = 0
+        self.wire_bytes_sent = 0
+        self.message_bytes_received = 0
+        self.message_bytes_sent = 0
+        self.messages_received = 0
+        self.messages_sent = 0
+
+    @property
+    def compressed(self):
+        """Property to check if `permessage-deflate` was negotiated."""
+        return any(extension.name == PerMessageDeflate.name
+                   for extension in self.extensions)
+
+    @property
+    def connected(self):
+        """Property to check if the websocket is open."""
+        return self.writer is not None and not self.writer.is_closing()
+
+    def _callback(self, callback, *args):
+        """Run a user callback, reporting its failures through `on_error`.
+
+        :param callback:
+        :param args:
+
+        """
+        if callback is None:
+            return
+        try:
+            callback(self, *args)
+        except Exception as e:
+            logger.exception(e)
+            if callback is not self.on_error and self.on_error:
+                self.on_error(self, e)
+
+    def _build_request(self, url, origin=None, host=None):
+        """
+
+        :param url:
+        :param origin:  (Default value = None)
+        :param host:  (Default value = None)
+
+        """
+        target = url.path or "/"
+        if url.query:
+            target = f"{target}?{url.query}"
+        extra_headers = [
+            (key, value) for key, value in self.header.items()
+            if value is not None and key.lower() not in HANDSHAKE_HEADERS
+        ]
+        if origin:
+            extra_headers.append(("Origin", origin))
+        if self.cookie:
+            extra_headers.append(("Cookie", self.cookie))
+        extensions = []
+        if self.compression:
+            extensions.append(PerMessageDeflate(**self.compression_options))
+        return Request(
+            host=host or url.hostname,
+            target=target,
+            extensions=extensions,
+            extra_headers=extra_headers,
+        )
+
+    async def run_forever(self, origin=None, host=None, sslopt=None, **kwargs):
+        """Connect, perform the upgrade and dispatch frames until closed.
+
+        Accepts the same keyword arguments as
+        :meth:`websocket.WebSocketApp.run_forever`; the ping options are
+        ignored, heartbeats are handled at the Engine.IO level.
+
+        :param origin:  (Default value = None)
+        :param host:  (Default value = None)
+        :param sslopt:  (Default value = None)
+
+        """
+        url = urlsplit(self.url)
+        secure = url.scheme == "wss"
+        port = url.port or (443 if secure else 80)
+        ssl_context = None
+        if secure:
+            sslopt = sslopt or {}
+            ssl_context = sslopt.get("context") or ssl.create_default_context()
+            if "check_hostname" in sslopt:
+                ssl_context.check_hostname = sslopt["check_hostname"]
+            if "cert_reqs" in sslopt:
+                ssl_context.verify_mode = sslopt["cert_reqs"]
+        close_code, close_reason = None, None
+        self.keep_running = True
+        try:
+            self.reader, self.writer = await asyncio.open_connection(
+                url.hostname,
+                port,
+                ssl=ssl_context,
+                server_hostname=url.hostname if secure else None,
+            )
+            self.connection = WSConnection(ConnectionType.CLIENT)
+            self.extensions = []
+            self._write(
+                self.connection.send(self._build_request(url, origin, host)))
+            while self.keep_running:
+                data = await self.reader.read(self.read_size)
+                self.wire_bytes_received += len(data)
+                self.connection.receive_data(data or None)
+                for event in self.connection.events():
+                    if isinstance(event, AcceptConnection):
+                        self.extensions = event.extensions
+                        logger.debug(
+                            "Websocket extensions negotiated: "
+                            f"{[extension.name for extension in self.extensions]}")
+                        self._callback(self.on_open)
+                    elif isinstance(event, RejectConnection):
+                        raise ConnectionError(
+                            f"Websocket handshake rejected with status {event.status_code}."
+                        )
+                    elif isinstance(event, (TextMessage, BytesMessage)):
+                        self._on_data(event)
+                    elif isinstance(event, Ping):
+                        self._write(self.connection.send(event.response()))
+                        self._callback(self.on_ping, event.payload)
+                    elif isinstance(event, Pong):
+                        self._callback(self.on_pong, event.payload)
+                    elif isinstance(event, CloseConnection):
+                        close_code, close_reason = event.code, event.reason
+                        if self.connection.state == ConnectionState.REMOTE_CLOSING:
+                            self._write(self.connection.send(event.response()))
+                        self.keep_running = False
+                if not data:
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._callback(self.on_error, e)
+        finally:
+            self.keep_running = False
+            self._close_transport()
+            self._callback(self.on_close, close_code, close_reason)
+
+    def _on_data(self, event):
+        """Collect message fragments and deliver complete messages.
+
+        :param event:
+
+        """
+        if not event.message_finished:
+            self._fragments.append(event.data)
+            return
+        data = event.data
+        if self._fragments:
+            self._fragments.append(data)
+            joiner = "" if isinstance(data, str) else b""
+            data = joiner.join(self._fragments)
+            self._fragments = []
+        self.messages_received += 1
+        self.message_bytes_received += len(data)
+        self._callback(self.on_message, data)
+
+    def _write(self, data):
+        """
+
+        :param data:
+
+        """
+        if self.connected:
+            self.wire_bytes_sent += len(data)
+            self.writer.write(data)
+
+    def send(self, data):
+        """Send a text frame, or a binary frame for `bytes` payloads.
+
+        :param data:
+
+        """
+        self.send_many([data])
+
+    def send_many(self, frames):
+        """Send several frames with a single write to the socket.
+
+        :param frames: The `str` or `bytes` payloads, in order.
+
+        """
+        if not self.connected:
+            raise ConnectionError("Websocket is not connected.")
+        chunks = []
+        for data in frames:
+            if isinstance(data, str):
+                event = TextMessage(data=data)
+            else:
+                event = BytesMessage(data=data)
+            self.messages_sent += 1
+            self.message_bytes_sent += len(data)
+            chunks.append(self.connection.send(event))
+        self._write(b"".join(chunks))
+
+    def close(self, status=1000, reason=""):
+        """Start the closing handshake and stop reading.
+
+        :param status:  (Default value = 1000)
+        :param reason:  (Default value = "")
+
+        """
+        self.keep_running = False
+        if self.connected and self.connection.state == ConnectionState.OPEN:
+            self._write(
+                self.connection.send(CloseConnection(code=status, reason=reason)))
+        self._close_transport()
+
+    def _close_transport(self):
+        """ """
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.close()
+
+    def stats(self):
+        """Get the bandwidth counters.
+
+        Message sizes count the decoded payloads, characters for text frames,
+        and wire sizes the bytes read from and written to the socket, so their
+        ratio is the saving of `permessage-deflate`.
+
+        :returns: A dict with the negotiated extensions and byte counters.
+        """
+        return {
+            "compressed": self.compressed,
+            "extensions": [extension.name for extension in self.extensions],
+            "messages_received": self.messages_received,
+            "messages_sent": self.messages_sent,
+            "message_bytes_received": self.message_bytes_received,
+            "message_bytes_sent": self.message_bytes_sent,
+            "wire_bytes_received": self.wire_bytes_received,
+            "wire_bytes_sent": self.wire_bytes_sent,
+            "compression_ratio": (
+                self.message_bytes_received / self.wire_bytes_received
+                if self.wire_bytes_received else 0.0),
+        }
@@ -28,6 +28,7 @@ setup(
         'requests',
         'beautifulsoup4',
         'websocket-client',
+        'wsproto',
         'playwright',
         'playwright-stealth',
         'pyfiglet',